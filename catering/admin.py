@@ -4,11 +4,15 @@ from django.contrib.auth.models import User
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from .models import (
     Cliente, Responsable, TipoProducto, Producto, Comprobante,
-    EventoSolicitado, MenuXTipoProducto, Senia, Personal, Servicio, PerfilUsuario
+    EventoSolicitado, MenuXTipoProducto, Senia, Personal, Servicio, PerfilUsuario,
+    OcupacionDiaria
 )
 from .forms import ClienteForm
+from .precios import repreciar_menus
 
 @admin.register(Cliente)
 class ClienteAdmin(admin.ModelAdmin):
@@ -132,6 +136,7 @@ class ProductoAdmin(admin.ModelAdmin):
     search_fields = ['descripcion']
     readonly_fields = ['id_producto']
     list_editable = ['disponible']
+    actions = ['actualizar_precios_menus']
     
     fieldsets = (
         ('Información del Producto', {
@@ -143,6 +148,15 @@ class ProductoAdmin(admin.ModelAdmin):
         }),
     )
 
+    def actualizar_precios_menus(self, request, queryset):
+        """Acción para aplicar el precio actual a los menús de eventos abiertos"""
+        resultado = repreciar_menus(productos=queryset)
+        self.message_user(
+            request,
+            f"Se actualizaron {resultado['lineas']} líneas de menú en {resultado['eventos']} eventos abiertos."
+        )
+    actualizar_precios_menus.short_description = "Actualizar precios en menús de eventos abiertos"
+
 @admin.register(Comprobante)
 class ComprobanteAdmin(admin.ModelAdmin):
     list_display = ['id_comprobante', 'id_cliente', 'fecha_pedido', 'total_servicio', 'precio_x_persona', 'fecha_vigencia']
@@ -175,9 +189,23 @@ class EventoSolicitadoAdmin(admin.ModelAdmin):
     readonly_fields = ['id_evento']
     date_hierarchy = 'fecha'
     list_editable = ['estado']
+    list_select_related = ['id_cliente']
+    
+    def get_queryset(self, request):
+        ocupacion = OcupacionDiaria.objects.filter(fecha=OuterRef('fecha')).values('eventos_activos')
+        return super().get_queryset(request).annotate(
+            ocupacion_fecha=Coalesce(Subquery(ocupacion), 0)
+        )
     
     def disponibilidad(self, obj):
-        if obj.verificar_disponibilidad():
+        if not hasattr(obj, 'ocupacion_fecha'):
+            disponible = obj.verificar_disponibilidad()
+        else:
+            otros_eventos = obj.ocupacion_fecha
+            if obj.estado in EventoSolicitado.ESTADOS_ACTIVOS:
+                otros_eventos -= 1
+            disponible = otros_eventos < EventoSolicitado.MAX_EVENTOS_POR_DIA
+        if disponible:
             return format_html('<span style="color: green;">✓ Disponible</span>')
         else:
             return format_html('<span style="color: red;">✗ No Disponible</span>')
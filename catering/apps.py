@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class CateringConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'catering'
+
+    def ready(self):
+        from . import signals
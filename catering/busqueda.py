@@ -0,0 +1,113 @@
+import math
+from django.db import connection
+from django.db.models import Count, FloatField, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+from .models import Cliente, ClienteNgrama, Responsable
+
+# Proporción de trigramas de la búsqueda que debe tener un cliente para aparecer;
+# deja pasar errores de tipeo ('gonzales' encuentra 'González') y el orden los relega
+COINCIDENCIA_MINIMA = 0.6
+
+def usa_fulltext():
+    """MySQL resuelve la búsqueda con el índice FULLTEXT; el resto de las bases con ClienteNgrama"""
+    return connection.vendor == 'mysql'
+
+def _sin_resultados():
+    return Cliente.objects.none().annotate(relevancia=Value(0, output_field=FloatField()))
+
+def _buscar_fulltext(texto):
+    palabras = ClienteNgrama.palabras(texto)
+    if not palabras:
+        return _sin_resultados()
+    # Cada palabra como frase: con el parser ngram equivale a buscarla como subcadena
+    consulta = ' '.join(f'"{palabra}"' for palabra in palabras)
+    tabla = Cliente._meta.db_table
+    columnas = ', '.join(f'{tabla}.{campo}' for campo in ClienteNgrama.CAMPOS)
+    # Redondeada para que el cursor de paginación compare el mismo valor que devolvió
+    relevancia = RawSQL(
+        f'ROUND(MATCH ({columnas}) AGAINST (%s IN BOOLEAN MODE), 6)', [consulta], output_field=FloatField()
+    )
+    return Cliente.objects.annotate(relevancia=relevancia).filter(relevancia__gt=0)
+
+def _buscar_ngramas(texto):
+    ngramas = ClienteNgrama.ngramas(texto)
+    if not ngramas:
+        return _sin_resultados()
+    minimo = math.ceil(len(ngramas) * COINCIDENCIA_MINIMA)
+    coincidencias = ClienteNgrama.objects.filter(ngrama__in=ngramas)
+    candidatos = coincidencias.values('id_cliente').annotate(
+        total=Count('ngrama')
+    ).filter(total__gte=minimo).values('id_cliente')
+    relevancia = coincidencias.filter(id_cliente=OuterRef('pk')).values('id_cliente').annotate(
+        total=Count('ngrama')
+    ).values('total')
+    return Cliente.objects.filter(pk__in=candidatos).annotate(
+        relevancia=Subquery(relevancia, output_field=IntegerField())
+    )
+
+def _buscar_prefijo(texto):
+    """
+    Palabras más cortas que un trigrama: ni ClienteNgrama ni el parser ngram las
+    encuentran dentro de otra palabra, así que se buscan como prefijo del apellido
+    o del nombre, con los mismos índices que el autocompletado.
+    """
+    clientes = Cliente.objects.all()
+    for palabra in texto.split():
+        clientes = clientes.filter(Q(apellido__istartswith=palabra) | Q(nombre__istartswith=palabra))
+    return clientes.annotate(relevancia=Value(1, output_field=FloatField()))
+
+def buscar_clientes(texto):
+    """
+    Clientes que coinciden con el texto, anotados con 'relevancia' (mayor es mejor).
+    Un número de documento exacto se resuelve con el índice único de num_doc sin
+    pasar por la búsqueda de texto.
+    """
+    texto = (texto or '').strip()
+    exacto = Cliente.objects.filter(num_doc=texto)
+    if texto and exacto.exists():
+        return exacto.annotate(relevancia=Value(1, output_field=FloatField()))
+    palabras = ClienteNgrama.palabras(texto)
+    if palabras and all(len(palabra) < ClienteNgrama.LARGO for palabra in palabras):
+        return _buscar_prefijo(texto)
+    if usa_fulltext():
+        return _buscar_fulltext(texto)
+    return _buscar_ngramas(texto)
+
+# Resultados que devuelve el autocompletado y largo mínimo del texto para consultar
+LIMITE_AUTOCOMPLETAR = 10
+LARGO_MINIMO_AUTOCOMPLETAR = 2
+
+def _palabras_autocompletar(texto):
+    texto = (texto or '').strip()
+    if len(texto) < LARGO_MINIMO_AUTOCOMPLETAR:
+        return []
+    return texto.split()
+
+def autocompletar_clientes(texto, clientes=None):
+    """
+    Clientes cuyo apellido, nombre o documento empiezan con cada palabra del texto,
+    hasta LIMITE_AUTOCOMPLETAR. Las búsquedas por prefijo usan los índices de esas columnas.
+    """
+    palabras = _palabras_autocompletar(texto)
+    if not palabras:
+        return []
+    if clientes is None:
+        clientes = Cliente.objects.all()
+    for palabra in palabras:
+        clientes = clientes.filter(
+            Q(apellido__istartswith=palabra) |
+            Q(nombre__istartswith=palabra) |
+            Q(num_doc__startswith=palabra)
+        )
+    return list(clientes.order_by('apellido', 'nombre', 'id_cliente')[:LIMITE_AUTOCOMPLETAR])
+
+def autocompletar_responsables(texto, responsables=None):
+    """Responsables cuyo nombre empieza con el texto, hasta LIMITE_AUTOCOMPLETAR"""
+    texto = ' '.join(_palabras_autocompletar(texto))
+    if not texto:
+        return []
+    if responsables is None:
+        responsables = Responsable.objects.all()
+    return list(
+        responsables.filter(nombre_apellido__istartswith=texto).order_by('nombre_apellido', 'id_responsable')[:LIMITE_AUTOCOMPLETAR]
+    )
@@ -3,6 +3,7 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from .models import PerfilUsuario
+from .roles import rol_usuario
 
 def admin_required(view_func):
     """
@@ -11,16 +12,14 @@ def admin_required(view_func):
     @wraps(view_func)
     @login_required
     def _wrapped_view(request, *args, **kwargs):
-        try:
-            perfil = PerfilUsuario.objects.get(usuario=request.user)
-            if not perfil.es_admin():
-                messages.error(request, 'No tienes permisos para acceder a esta sección.')
-                return redirect('catering:index')
-        except PerfilUsuario.DoesNotExist:
-
+        rol = rol_usuario(request)
+        if rol is None:
             if not request.user.is_superuser:
                 messages.error(request, 'No tienes permisos para acceder a esta sección.')
                 return redirect('catering:index')
+        elif not rol.es_admin():
+            messages.error(request, 'No tienes permisos para acceder a esta sección.')
+            return redirect('catering:index')
         
         return view_func(request, *args, **kwargs)
     return _wrapped_view
@@ -32,16 +31,14 @@ def empleado_required(view_func):
     @wraps(view_func)
     @login_required
     def _wrapped_view(request, *args, **kwargs):
-        try:
-            perfil = PerfilUsuario.objects.get(usuario=request.user)
-            if not (perfil.es_admin() or perfil.es_empleado()):
-                messages.error(request, 'No tienes permisos para acceder a esta sección.')
-                return redirect('catering:index')
-        except PerfilUsuario.DoesNotExist:
-
+        rol = rol_usuario(request)
+        if rol is None:
             if not request.user.is_superuser:
                 messages.error(request, 'No tienes permisos para acceder a esta sección.')
                 return redirect('catering:index')
+        elif not (rol.es_admin() or rol.es_empleado()):
+            messages.error(request, 'No tienes permisos para acceder a esta sección.')
+            return redirect('catering:index')
         
         return view_func(request, *args, **kwargs)
     return _wrapped_view
@@ -53,16 +50,14 @@ def responsable_required(view_func):
     @wraps(view_func)
     @login_required
     def _wrapped_view(request, *args, **kwargs):
-        try:
-            perfil = PerfilUsuario.objects.get(usuario=request.user)
-            if not perfil.es_responsable():
-                messages.error(request, 'No tienes permisos para acceder a esta sección.')
-                return redirect('catering:index')
-        except PerfilUsuario.DoesNotExist:
-
+        rol = rol_usuario(request)
+        if rol is None:
             if not request.user.is_superuser:
                 messages.error(request, 'No tienes permisos para acceder a esta sección.')
                 return redirect('catering:index')
+        elif not rol.es_responsable():
+            messages.error(request, 'No tienes permisos para acceder a esta sección.')
+            return redirect('catering:index')
         
         return view_func(request, *args, **kwargs)
     return _wrapped_view
@@ -74,16 +69,14 @@ def responsable_or_admin_required(view_func):
     @wraps(view_func)
     @login_required
     def _wrapped_view(request, *args, **kwargs):
-        try:
-            perfil = PerfilUsuario.objects.get(usuario=request.user)
-            if not (perfil.es_admin() or perfil.es_responsable()):
-                messages.error(request, 'No tienes permisos para acceder a esta sección.')
-                return redirect('catering:index')
-        except PerfilUsuario.DoesNotExist:
-
+        rol = rol_usuario(request)
+        if rol is None:
             if not request.user.is_superuser:
                 messages.error(request, 'No tienes permisos para acceder a esta sección.')
                 return redirect('catering:index')
+        elif not (rol.es_admin() or rol.es_responsable()):
+            messages.error(request, 'No tienes permisos para acceder a esta sección.')
+            return redirect('catering:index')
         
         return view_func(request, *args, **kwargs)
     return _wrapped_view
@@ -95,25 +88,28 @@ def cliente_required(view_func):
     @wraps(view_func)
     @login_required
     def _wrapped_view(request, *args, **kwargs):
-        try:
-            perfil = PerfilUsuario.objects.get(usuario=request.user)
-            if not perfil.esta_activo():
-                messages.error(request, 'Tu cuenta no está activa.')
-                return redirect('catering:index')
-        except PerfilUsuario.DoesNotExist:
-
+        rol = rol_usuario(request)
+        if rol is None:
             if not request.user.is_superuser:
                 messages.error(request, 'No tienes permisos para acceder a esta sección.')
                 return redirect('catering:index')
+        elif not rol.esta_activo():
+            messages.error(request, 'Tu cuenta no está activa.')
+            return redirect('catering:index')
         
         return view_func(request, *args, **kwargs)
     return _wrapped_view
 
 def get_user_profile(user):
     """
-    Función auxiliar para obtener el perfil del usuario
+    Función auxiliar para obtener el perfil del usuario.
+    Django guarda la relación inversa (o su ausencia) en la instancia del usuario,
+    así que se consulta una sola vez por request. Para chequear permisos alcanza
+    con request.rol (ver roles.py), que no va a la base.
     """
+    if not user.is_authenticated:
+        return None
     try:
-        return PerfilUsuario.objects.get(usuario=user)
+        return user.perfilusuario
     except PerfilUsuario.DoesNotExist:
         return None
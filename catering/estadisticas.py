@@ -0,0 +1,308 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from datetime import timedelta
+from .models import Cliente, EventoSolicitado, PerfilUsuario, Personal, ResumenDiarioEventos
+
+ESTADOS_SERVICIO_ACTIVOS = ['ASIGNADO', 'EN_SERVICIO']
+
+ESTADOS_CON_INGRESOS = ['CONFIRMADO', 'EN_PROCESO', 'FINALIZADO']
+
+PREFIJO_CACHE = 'estadisticas'
+
+# Segundos que vive cada grupo en caché; las señales lo invalidan antes si cambian los datos
+TTL_ESTADISTICAS = {
+    'eventos': 60 * 5,
+    'clientes': 60 * 15,
+    'personal': 60 * 15,
+    'usuarios': 60 * 10,
+    # Solo cambia cuando corre actualizar_resumen_eventos, que además la invalida
+    'resumen': 60 * 60,
+}
+
+# Meses del gráfico de facturación de los dashboards
+MESES_INGRESOS = 6
+
+def estadisticas_eventos(eventos=None):
+    """
+    Contadores de eventos resueltos con un único aggregate.
+    Acepta un queryset ya filtrado (por cliente, responsable, etc.); por defecto
+    cuenta todos los eventos.
+    """
+    if eventos is None:
+        eventos = EventoSolicitado.objects.all()
+    hoy = timezone.now().date()
+
+    conteos = {
+        'total': Count('id_evento'),
+        'hoy': Count('id_evento', filter=Q(fecha=hoy)),
+        'este_mes': Count('id_evento', filter=Q(fecha__year=hoy.year, fecha__month=hoy.month)),
+        'activos': Count('id_evento', filter=Q(estado__in=EventoSolicitado.ESTADOS_ACTIVOS)),
+    }
+    for estado, _ in EventoSolicitado.ESTADO_CHOICES:
+        conteos[f'estado_{estado}'] = Count('id_evento', filter=Q(estado=estado))
+
+    datos = eventos.aggregate(**conteos)
+
+    por_estado = {
+        estado: datos.pop(f'estado_{estado}')
+        for estado, _ in EventoSolicitado.ESTADO_CHOICES
+    }
+    datos['por_estado'] = por_estado
+    datos['pendientes'] = por_estado['SOLICITADO']
+    datos['finalizados'] = por_estado['FINALIZADO']
+    datos['cancelados'] = por_estado['CANCELADO']
+    return datos
+
+def desglose_por_estado(estadisticas):
+    """
+    Lista de estados con eventos, ordenada por código, con cantidad y porcentaje
+    sobre el total (mismo formato que values('estado').annotate(count=...)).
+    """
+    total = estadisticas['total']
+    return [
+        {
+            'estado': estado,
+            'count': cantidad,
+            'porcentaje': round(cantidad / total * 100, 1) if total > 0 else 0,
+        }
+        for estado, cantidad in sorted(estadisticas['por_estado'].items())
+        if cantidad
+    ]
+
+def estadisticas_personal(personal=None):
+    """Contadores de personal por estado y tipo con un único aggregate"""
+    if personal is None:
+        personal = Personal.objects.all()
+    return personal.aggregate(
+        total=Count('id_personal'),
+        activos=Count('id_personal', filter=Q(estado='ACTIVO')),
+        mozos=Count('id_personal', filter=Q(tipo_personal='MOZO')),
+        cocineros=Count('id_personal', filter=Q(tipo_personal='COCINERO')),
+    )
+
+def estadisticas_clientes():
+    """Contadores de clientes"""
+    return Cliente.objects.aggregate(total=Count('id_cliente'))
+
+def estadisticas_usuarios():
+    """
+    Total de usuarios y su distribución por tipo de perfil, en una sola consulta
+    sobre auth_user unida a su perfil.
+    """
+    conteos = {'total': Count('id')}
+    for tipo, _ in PerfilUsuario.TIPO_USUARIO_CHOICES:
+        conteos[f'tipo_{tipo}'] = Count('perfilusuario', filter=Q(perfilusuario__tipo_usuario=tipo))
+
+    datos = User.objects.aggregate(**conteos)
+
+    datos['por_tipo'] = [
+        {'tipo_usuario': tipo, 'count': cantidad}
+        for tipo, cantidad in sorted(
+            (tipo, datos.pop(f'tipo_{tipo}')) for tipo, _ in PerfilUsuario.TIPO_USUARIO_CHOICES
+        )
+        if cantidad
+    ]
+    return datos
+
+def estadisticas_servicios(servicios):
+    """Contadores de servicios de personal con un único aggregate"""
+    hoy = timezone.now().date()
+    return servicios.aggregate(
+        total=Count('id_servicio'),
+        activos=Count('id_servicio', filter=Q(estado__in=ESTADOS_SERVICIO_ACTIVOS)),
+        completados=Count('id_servicio', filter=Q(estado='COMPLETADO')),
+        eventos_confirmados=Count('id_servicio', filter=Q(id_evento__estado__in=['CONFIRMADO', 'EN_PROCESO'])),
+        proximos=Count('id_servicio', filter=Q(
+            id_evento__fecha__gte=hoy, id_evento__fecha__lte=hoy + timedelta(days=30)
+        )),
+    )
+
+def _resumen(id_responsable=None):
+    resumen = ResumenDiarioEventos.objects.all()
+    if id_responsable is not None:
+        resumen = resumen.filter(id_responsable_id=id_responsable)
+    return resumen
+
+def _eventos_por_estado_resumen(id_responsable=None):
+    por_estado = dict(
+        _resumen(id_responsable).values('estado').annotate(
+            total=Sum('cantidad_eventos')
+        ).order_by().values_list('estado', 'total')
+    )
+    return desglose_por_estado({'total': sum(por_estado.values()), 'por_estado': por_estado})
+
+def _ingresos_por_mes(meses, id_responsable=None):
+    mes_actual = timezone.now().date().replace(day=1)
+    inicio = mes_actual
+    for _ in range(meses - 1):
+        inicio = (inicio - timedelta(days=1)).replace(day=1)
+    fin = (mes_actual + timedelta(days=32)).replace(day=1)
+
+    totales = {
+        fila['mes']: fila
+        for fila in _resumen(id_responsable).filter(
+            fecha__gte=inicio, fecha__lt=fin, estado__in=ESTADOS_CON_INGRESOS
+        ).annotate(mes=TruncMonth('fecha')).values('mes').annotate(
+            eventos=Sum('cantidad_eventos'),
+            ingresos=Sum('total_precio'),
+            senas=Sum('total_senas'),
+        ).order_by('mes')
+    }
+
+    filas = []
+    mes = inicio
+    while mes < fin:
+        fila = totales.get(mes, {})
+        filas.append({
+            'mes': mes,
+            'eventos': fila.get('eventos') or 0,
+            'ingresos': fila.get('ingresos') or 0,
+            'senas': fila.get('senas') or 0,
+        })
+        mes = (mes + timedelta(days=32)).replace(day=1)
+
+    maximo = max((fila['ingresos'] for fila in filas), default=0)
+    for fila in filas:
+        fila['porcentaje'] = int(fila['ingresos'] * 100 / maximo) if maximo else 0
+    return filas
+
+def clave_estadisticas(grupo, alcance=None):
+    """
+    Clave de caché de un grupo de estadísticas. Las de eventos y del resumen incluyen
+    la fecha porque los contadores de hoy y los meses del gráfico cambian con el día.
+    """
+    partes = [PREFIJO_CACHE, grupo]
+    if grupo in ('eventos', 'resumen'):
+        partes.append(timezone.now().date().isoformat())
+    if alcance:
+        partes.append(alcance)
+    return ':'.join(partes)
+
+def _clave_contador(grupo, resultado):
+    return f'{PREFIJO_CACHE}:{resultado}:{grupo}'
+
+def _contar(grupo, resultado):
+    clave = _clave_contador(grupo, resultado)
+    cache.add(clave, 0, timeout=None)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.set(clave, 1, timeout=None)
+
+def _desde_cache(grupo, calcular, alcance=None):
+    clave = clave_estadisticas(grupo, alcance)
+    datos = cache.get(clave)
+    if datos is not None:
+        _contar(grupo, 'aciertos')
+        return datos
+
+    _contar(grupo, 'fallos')
+    datos = calcular()
+    cache.set(clave, datos, TTL_ESTADISTICAS[grupo])
+    return datos
+
+def _alcance_resumen(vista, id_responsable=None):
+    return vista if id_responsable is None else f'{vista}:responsable:{id_responsable}'
+
+def eventos_por_estado_resumen(id_responsable=None):
+    """
+    Desglose de eventos por estado según el último resumen diario consolidado, con
+    el mismo formato que desglose_por_estado
+    """
+    return _desde_cache(
+        'resumen', lambda: _eventos_por_estado_resumen(id_responsable),
+        _alcance_resumen('estados', id_responsable)
+    )
+
+def ingresos_por_mes(meses=MESES_INGRESOS, id_responsable=None):
+    """
+    Eventos, facturación y señas de los últimos meses (incluido el actual) según el
+    último resumen diario consolidado. Solo cuentan los eventos confirmados, en
+    proceso o finalizados. porcentaje es la altura de la barra relativa al mes de
+    mayor facturación.
+    """
+    return _desde_cache(
+        'resumen', lambda: _ingresos_por_mes(meses, id_responsable),
+        _alcance_resumen(f'ingresos:{meses}', id_responsable)
+    )
+
+def obtener_estadisticas_eventos(id_responsable=None, id_cliente=None):
+    """
+    Estadísticas de eventos desde la caché, globales o de un responsable o cliente
+    """
+    eventos = EventoSolicitado.objects.all()
+    alcance = None
+    if id_responsable is not None:
+        eventos = eventos.filter(id_responsable_id=id_responsable)
+        alcance = f'responsable:{id_responsable}'
+    elif id_cliente is not None:
+        eventos = eventos.filter(id_cliente_id=id_cliente)
+        alcance = f'cliente:{id_cliente}'
+    return _desde_cache('eventos', lambda: estadisticas_eventos(eventos), alcance)
+
+def obtener_estadisticas_clientes():
+    return _desde_cache('clientes', estadisticas_clientes)
+
+def obtener_estadisticas_personal():
+    return _desde_cache('personal', estadisticas_personal)
+
+def obtener_estadisticas_usuarios():
+    return _desde_cache('usuarios', estadisticas_usuarios)
+
+def invalidar_estadisticas(grupo, alcances=()):
+    """
+    Borra de la caché las estadísticas globales de un grupo y las de los alcances
+    indicados. Dentro de una transacción se espera a que confirme, para que ninguna
+    vista vuelva a guardar valores sin los cambios.
+    """
+    claves = [clave_estadisticas(grupo)]
+    claves.extend(clave_estadisticas(grupo, alcance) for alcance in alcances if alcance)
+    transaction.on_commit(lambda: cache.delete_many(claves))
+
+def invalidar_resumen():
+    """
+    Borra de la caché las lecturas del resumen diario, globales y de cada responsable.
+    La llama actualizar_resumen_eventos después de actualizar el resumen.
+    """
+    responsables = ResumenDiarioEventos.objects.filter(
+        id_responsable__isnull=False
+    ).values_list('id_responsable_id', flat=True).distinct()
+    alcances = [
+        _alcance_resumen(vista, id_responsable)
+        for vista in ('estados', f'ingresos:{MESES_INGRESOS}')
+        for id_responsable in [None, *responsables]
+    ]
+    claves = [clave_estadisticas('resumen', alcance) for alcance in alcances]
+    transaction.on_commit(lambda: cache.delete_many(claves))
+
+def contadores_cache():
+    """Aciertos, fallos y tasa de aciertos de la caché por grupo de estadísticas"""
+    claves = {
+        (grupo, resultado): _clave_contador(grupo, resultado)
+        for grupo in TTL_ESTADISTICAS
+        for resultado in ('aciertos', 'fallos')
+    }
+    valores = cache.get_many(list(claves.values()))
+
+    contadores = {}
+    for grupo in TTL_ESTADISTICAS:
+        aciertos = valores.get(claves[(grupo, 'aciertos')], 0)
+        fallos = valores.get(claves[(grupo, 'fallos')], 0)
+        total = aciertos + fallos
+        contadores[grupo] = {
+            'aciertos': aciertos,
+            'fallos': fallos,
+            'tasa_aciertos': round(aciertos / total * 100, 1) if total else 0,
+        }
+    return contadores
+
+def reiniciar_contadores_cache():
+    cache.delete_many([
+        _clave_contador(grupo, resultado)
+        for grupo in TTL_ESTADISTICAS
+        for resultado in ('aciertos', 'fallos')
+    ])
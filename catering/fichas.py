@@ -0,0 +1,63 @@
+from .models import Personal, Responsable
+
+FICHAS = {
+    'responsable': Responsable,
+    'personal': Personal,
+}
+
+def _clave_sesion(tipo):
+    return f'ficha_{tipo}'
+
+def _memoria(request, atributo):
+    if not hasattr(request, atributo):
+        setattr(request, atributo, {})
+    return getattr(request, atributo)
+
+def _guardar_en_sesion(request, tipo, id_encontrado):
+    # Solo se guardan ids encontrados, para que vincular la ficha después no requiera volver a iniciar sesión
+    if id_encontrado is None:
+        request.session.pop(_clave_sesion(tipo), None)
+    else:
+        request.session[_clave_sesion(tipo)] = id_encontrado
+    _memoria(request, '_ids_fichas')[tipo] = id_encontrado
+
+def id_ficha(request, tipo):
+    """
+    Id de la ficha ('responsable' o 'personal') vinculada al usuario por la FK
+    usuario, o None. Se guarda en la sesión y en cada request se comprueba con una
+    búsqueda por clave primaria que siga vinculada al usuario, así un cambio de
+    vínculo hecho por un administrador rige enseguida.
+    """
+    ids = _memoria(request, '_ids_fichas')
+    if tipo not in ids:
+        modelo = FICHAS[tipo]
+        id_guardado = request.session.get(_clave_sesion(tipo))
+        if id_guardado is None or not modelo.objects.filter(pk=id_guardado, usuario=request.user).exists():
+            id_guardado = modelo.objects.filter(usuario=request.user).values_list('pk', flat=True).first()
+        _guardar_en_sesion(request, tipo, id_guardado)
+    return ids[tipo]
+
+def ficha_de_usuario(request, tipo):
+    """
+    Responsable o Personal del usuario del request, o None. Se lee por clave
+    primaria a partir del id de la sesión y queda memorizado en el request.
+    """
+    fichas = _memoria(request, '_fichas')
+    if tipo not in fichas:
+        modelo = FICHAS[tipo]
+        ficha = None
+        id_guardado = request.session.get(_clave_sesion(tipo))
+        if id_guardado is not None:
+            ficha = modelo.objects.filter(pk=id_guardado, usuario=request.user).first()
+        if ficha is None:
+            # Sin id en la sesión, o la ficha se borró o se desvinculó: se resuelve de nuevo por la FK
+            ficha = modelo.objects.filter(usuario=request.user).first()
+        _guardar_en_sesion(request, tipo, ficha.pk if ficha else None)
+        fichas[tipo] = ficha
+    return fichas[tipo]
+
+def responsable_de_usuario(request):
+    return ficha_de_usuario(request, 'responsable')
+
+def personal_de_usuario(request):
+    return ficha_de_usuario(request, 'personal')
@@ -2,6 +2,9 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.contrib.auth.models import User
+from django.forms.utils import flatatt
+from django.urls import reverse
+from django.utils.html import format_html
 from datetime import datetime, timedelta
 from .models import (
     Cliente, Responsable, TipoProducto, Producto, Comprobante,
@@ -9,6 +12,45 @@ from .models import (
     Provincia, Barrio
 )
 
+class AutocompletarWidget(forms.Widget):
+    """
+    Reemplaza el select de un ModelChoiceField por un campo de texto que consulta
+    la API de autocompletado ('clientes' o 'responsables'). El valor viaja en un
+    input oculto, así que el formulario no carga todas las opciones para dibujarse.
+    """
+
+    def __init__(self, tipo, attrs=None):
+        super().__init__(attrs)
+        self.tipo = tipo
+
+    def id_for_label(self, id_):
+        return f'{id_}_texto' if id_ else id_
+
+    def _texto(self, value):
+        # Solo se consulta la opción elegida, para mostrar su nombre
+        if value in (None, '') or not hasattr(self, 'choices'):
+            return ''
+        try:
+            objeto = self.choices.queryset.filter(pk=value).first()
+        except (TypeError, ValueError, ValidationError):
+            return ''
+        return self.choices.field.label_from_instance(objeto) if objeto else ''
+
+    def render(self, name, value, attrs=None, renderer=None):
+        attrs = self.build_attrs(self.attrs, attrs)
+        id_ = attrs.pop('id', None)
+        attrs['id'] = self.id_for_label(id_)
+        return format_html(
+            '<input type="hidden" name="{}" id="{}" value="{}">'
+            '<div class="position-relative">'
+            '<input type="text"{} value="{}" autocomplete="off" data-autocompletar="{}" data-destino="{}">'
+            '<div class="dropdown-menu w-100"></div>'
+            '</div>',
+            name, id_ or '', '' if value is None else value,
+            flatatt(attrs), self._texto(value),
+            reverse('catering:autocompletar', args=[self.tipo]), id_ or '',
+        )
+
 class ClienteForm(forms.ModelForm):
     """Formulario para crear y editar clientes"""
 
@@ -126,8 +168,8 @@ class EventoForm(forms.ModelForm):
         fields = ['id_cliente', 'id_responsable', 'tipo_evento', 'fecha', 'hora', 'ubicacion', 'cantidad_personas', 
                  'tiene_sena', 'monto_sena', 'fecha_sena', 'observaciones_sena']
         widgets = {
-            'id_cliente': forms.Select(attrs={'class': 'form-select'}),
-            'id_responsable': forms.Select(attrs={'class': 'form-select'}),
+            'id_cliente': AutocompletarWidget('clientes', attrs={'class': 'form-control', 'placeholder': 'Buscar por apellido, nombre o documento'}),
+            'id_responsable': AutocompletarWidget('responsables', attrs={'class': 'form-control', 'placeholder': 'Buscar por nombre'}),
             'tipo_evento': forms.Select(attrs={'class': 'form-select'}),
             'fecha': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
             'hora': forms.TimeInput(attrs={'class': 'form-control', 'type': 'time'}),
@@ -379,6 +421,43 @@ class MenuForm(forms.ModelForm):
         
         return cleaned_data
 
+class MenuLoteForm(forms.Form):
+    """Formulario para agregar varios productos al menú en un solo envío"""
+    items = forms.JSONField(
+        help_text='Lista de objetos {"id_producto": id, "cantidad_producto": cantidad}'
+    )
+    
+    def clean_items(self):
+        """Valida los items y los agrupa en un diccionario {id_producto: cantidad}"""
+        items = self.cleaned_data['items']
+        if not isinstance(items, list) or not items:
+            raise ValidationError('Debe enviar una lista de productos.')
+        
+        cantidades = {}
+        for item in items:
+            try:
+                id_producto = int(item['id_producto'])
+                cantidad = int(item['cantidad_producto'])
+            except (KeyError, TypeError, ValueError):
+                raise ValidationError('Cada producto debe indicar id_producto y cantidad_producto numéricos.')
+            if cantidad < 1:
+                raise ValidationError('La cantidad de cada producto debe ser al menos 1.')
+            cantidades[id_producto] = cantidades.get(id_producto, 0) + cantidad
+        
+        self.precios = dict(
+            Producto.objects.filter(id_producto__in=list(cantidades), disponible=True)
+            .values_list('id_producto', 'precio')
+        )
+        faltantes = sorted(set(cantidades) - set(self.precios))
+        if faltantes:
+            raise ValidationError(f'Productos inexistentes o no disponibles: {", ".join(map(str, faltantes))}')
+        
+        return cantidades
+
+class CotizacionForm(MenuLoteForm):
+    """Formulario para cotizar un menú hipotético sin crear el evento"""
+    cantidad_personas = forms.IntegerField(min_value=1, max_value=1000)
+
 class ComprobanteForm(forms.ModelForm):
     """Formulario para crear comprobantes"""
     
@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from catering.precios import repreciar_menus, resumen_repreciado
+
+class Command(BaseCommand):
+    help = 'Actualiza los precios de los menús de eventos abiertos según el precio actual de cada producto'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--producto', type=int, nargs='+', help='IDs de productos a actualizar (por defecto, todos)')
+        parser.add_argument('--lote', type=int, default=2000, help='Cantidad de líneas de menú por UPDATE')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa los cambios, sin modificar nada')
+
+    def handle(self, *args, **options):
+        productos = options['producto']
+
+        if options['dry_run']:
+            resumen = resumen_repreciado(productos)
+            self.stdout.write(f'🔍 Líneas de menú a actualizar: {resumen["lineas"]}')
+            self.stdout.write(f'🔍 Eventos afectados: {resumen["eventos"]}')
+            self.stdout.write(f'🔍 Diferencia total en productos: ${resumen["diferencia"]:.2f}')
+            for fila in resumen['por_producto']:
+                self.stdout.write(
+                    f'   • {fila["id_producto__descripcion"]} (${fila["id_producto__precio"]:.2f}): '
+                    f'{fila["lineas"]} líneas, diferencia ${fila["diferencia"]:.2f}'
+                )
+            return
+
+        inicio = time.monotonic()
+        resultado = repreciar_menus(productos, tamano_lote=options['lote'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {resultado["lineas"]} líneas de menú y {resultado["eventos"]} eventos actualizados '
+                f'en {time.monotonic() - inicio:.1f} s'
+            )
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from catering.models import ResumenDiarioEventos
+from catering.estadisticas import invalidar_resumen
+
+class Command(BaseCommand):
+    help = 'Actualiza el resumen diario de eventos para las fechas modificadas desde la última ejecución'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--completo', action='store_true',
+                            help='Reconstruye el resumen de todas las fechas')
+        parser.add_argument('--lote', type=int, default=500,
+                            help='Cantidad de fechas recalculadas por transacción (por defecto 500)')
+
+    def handle(self, *args, **options):
+        if options['completo']:
+            filas = ResumenDiarioEventos.reconstruir()
+            invalidar_resumen()
+            self.stdout.write(self.style.SUCCESS(f'✅ Resumen reconstruido: {filas} filas'))
+            return
+
+        total_fechas, total_filas = ResumenDiarioEventos.actualizar_pendientes(options['lote'])
+        if total_fechas:
+            invalidar_resumen()
+
+        if not total_fechas:
+            self.stdout.write('ℹ️ No hay fechas pendientes')
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Resumen actualizado: {total_fechas} fechas, {total_filas} filas')
+        )
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from catering.models import OcupacionDiaria
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla de ocupación diaria desde los eventos y verifica desvíos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verificar', action='store_true',
+                            help='Solo informa las fechas con desvío, sin modificar la tabla')
+
+    def handle(self, *args, **options):
+        conteo_real = OcupacionDiaria.conteo_real()
+
+        if options['verificar']:
+            self.verificar(conteo_real)
+            return
+
+        with transaction.atomic():
+            OcupacionDiaria.objects.all().delete()
+            OcupacionDiaria.objects.bulk_create([
+                OcupacionDiaria(fecha=fecha, eventos_activos=total)
+                for fecha, total in conteo_real.items()
+            ], batch_size=1000)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Ocupación reconstruida para {len(conteo_real)} fechas')
+        )
+
+    def verificar(self, conteo_real):
+        guardado = dict(
+            OcupacionDiaria.objects.exclude(eventos_activos=0).values_list('fecha', 'eventos_activos')
+        )
+
+        desvios = []
+        for fecha in sorted(set(conteo_real) | set(guardado)):
+            esperado = conteo_real.get(fecha, 0)
+            actual = guardado.get(fecha, 0)
+            if esperado != actual:
+                desvios.append((fecha, actual, esperado))
+
+        if not desvios:
+            self.stdout.write(self.style.SUCCESS('✅ La ocupación diaria coincide con los eventos'))
+            return
+
+        for fecha, actual, esperado in desvios:
+            self.stdout.write(f'   • {fecha}: tabla={actual} eventos={esperado}')
+        raise CommandError(
+            f'Se encontraron {len(desvios)} fechas con desvío. Ejecute el comando sin --verificar para reconstruir.'
+        )
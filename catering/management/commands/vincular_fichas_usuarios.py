@@ -0,0 +1,49 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from catering.models import Personal, Responsable
+
+class Command(BaseCommand):
+    help = 'Vincula por email los responsables y el personal sin usuario con su usuario del sistema'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo informa los vínculos que se harían, sin guardarlos')
+
+    def handle(self, *args, **options):
+        # Emails de más de un usuario: no se puede saber a cuál corresponde la ficha
+        usuarios_por_email = {}
+        for id_usuario, email in User.objects.exclude(email='').values_list('id', 'email'):
+            usuarios_por_email.setdefault(email.lower(), []).append(id_usuario)
+
+        with transaction.atomic():
+            for modelo in (Responsable, Personal):
+                self.vincular(modelo, usuarios_por_email, options['dry_run'])
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+    def vincular(self, modelo, usuarios_por_email, dry_run):
+        ya_vinculados = set(
+            modelo.objects.filter(usuario__isnull=False).values_list('usuario_id', flat=True)
+        )
+        nombre = modelo._meta.verbose_name_plural.lower()
+
+        vinculados = 0
+        omitidos = []
+        for ficha in modelo.objects.filter(usuario__isnull=True).exclude(email=''):
+            candidatos = usuarios_por_email.get(ficha.email.lower(), [])
+            if len(candidatos) != 1 or candidatos[0] in ya_vinculados:
+                if candidatos:
+                    omitidos.append(ficha)
+                continue
+            ficha.usuario_id = candidatos[0]
+            ficha.save(update_fields=['usuario'])
+            ya_vinculados.add(candidatos[0])
+            vinculados += 1
+
+        prefijo = '🔍 Se vincularían' if dry_run else '✅ Vinculados'
+        self.stdout.write(self.style.SUCCESS(f'{prefijo} {vinculados} {nombre}'))
+        for ficha in omitidos:
+            self.stdout.write(
+                f'   • {ficha} ({ficha.email}): el email es de varios usuarios o el usuario ya tiene ficha'
+            )
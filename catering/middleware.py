@@ -0,0 +1,16 @@
+from .roles import rol_usuario
+
+class PerfilUsuarioMiddleware:
+    """
+    Deja en request.rol el tipo y estado del perfil del usuario autenticado (o None si
+    no tiene), leídos de la caché de roles. Los permisos se resuelven sin consultar la
+    base; quien necesite el perfil completo usa get_user_profile(), que lo carga una
+    sola vez por request en request.user.perfilusuario.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rol_usuario(request)
+        return self.get_response(request)
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+def cargar_ocupacion(apps, schema_editor):
+    EventoSolicitado = apps.get_model('catering', 'EventoSolicitado')
+    OcupacionDiaria = apps.get_model('catering', 'OcupacionDiaria')
+    conteo = EventoSolicitado.objects.filter(
+        estado__in=['SOLICITADO', 'CONFIRMADO', 'EN_PROCESO']
+    ).values('fecha').annotate(total=models.Count('id_evento')).values_list('fecha', 'total')
+    OcupacionDiaria.objects.bulk_create([
+        OcupacionDiaria(fecha=fecha, eventos_activos=total) for fecha, total in conteo
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catering', '0005_personal_usuario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OcupacionDiaria',
+            fields=[
+                ('fecha', models.DateField(primary_key=True, serialize=False, verbose_name='Fecha')),
+                ('eventos_activos', models.PositiveIntegerField(default=0, verbose_name='Eventos Activos')),
+            ],
+            options={
+                'verbose_name': 'Ocupación Diaria',
+                'verbose_name_plural': 'Ocupaciones Diarias',
+                'ordering': ['fecha'],
+            },
+        ),
+        migrations.RunPython(cargar_ocupacion, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def cargar_resumen(apps, schema_editor):
+    EventoSolicitado = apps.get_model('catering', 'EventoSolicitado')
+    ResumenDiarioEventos = apps.get_model('catering', 'ResumenDiarioEventos')
+    grupos = EventoSolicitado.objects.values('fecha', 'tipo_evento', 'estado', 'id_responsable').annotate(
+        cantidad=models.Count('id_evento'),
+        personas=models.Sum('cantidad_personas'),
+        precio=models.Sum('precio_total'),
+        senas=models.Sum('monto_sena'),
+    ).order_by()
+    ResumenDiarioEventos.objects.bulk_create([
+        ResumenDiarioEventos(
+            fecha=grupo['fecha'],
+            tipo_evento=grupo['tipo_evento'],
+            estado=grupo['estado'],
+            id_responsable_id=grupo['id_responsable'],
+            cantidad_eventos=grupo['cantidad'],
+            total_personas=grupo['personas'] or 0,
+            total_precio=grupo['precio'] or 0,
+            total_senas=grupo['senas'] or 0,
+        )
+        for grupo in grupos
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catering', '0006_ocupaciondiaria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FechaResumenPendiente',
+            fields=[
+                ('fecha', models.DateField(primary_key=True, serialize=False, verbose_name='Fecha')),
+            ],
+            options={
+                'verbose_name': 'Fecha de Resumen Pendiente',
+                'verbose_name_plural': 'Fechas de Resumen Pendientes',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenDiarioEventos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('tipo_evento', models.CharField(choices=[('CASAMIENTO', 'Casamiento'), ('CUMPLEAÑOS', 'Cumpleaños'), ('EVENTO_COMERCIAL', 'Evento Comercial'), ('OTRO', 'Otro')], max_length=20, verbose_name='Tipo de Evento')),
+                ('estado', models.CharField(choices=[('SOLICITADO', 'Solicitado'), ('CONFIRMADO', 'Confirmado'), ('EN_PROCESO', 'En Proceso'), ('FINALIZADO', 'Finalizado'), ('CANCELADO', 'Cancelado'), ('VENCIDO', 'Vencido')], max_length=20, verbose_name='Estado')),
+                ('cantidad_eventos', models.PositiveIntegerField(default=0, verbose_name='Cantidad de Eventos')),
+                ('total_personas', models.PositiveIntegerField(default=0, verbose_name='Total de Personas')),
+                ('total_precio', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total Facturado')),
+                ('total_senas', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total de Señas')),
+                ('id_responsable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='catering.responsable', verbose_name='Responsable')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Eventos',
+                'verbose_name_plural': 'Resúmenes Diarios de Eventos',
+                'ordering': ['fecha'],
+                'unique_together': {('fecha', 'tipo_evento', 'estado', 'id_responsable')},
+            },
+        ),
+        migrations.RunPython(cargar_resumen, migrations.RunPython.noop),
+    ]
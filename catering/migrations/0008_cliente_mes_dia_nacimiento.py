@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+TAMANO_LOTE = 1000
+
+
+def cargar_mes_dia_nacimiento(apps, schema_editor):
+    Cliente = apps.get_model('catering', 'Cliente')
+    clientes = Cliente.objects.exclude(fecha_nacimiento__isnull=True).only('fecha_nacimiento')
+    lote = []
+    for cliente in clientes.iterator(chunk_size=TAMANO_LOTE):
+        cliente.mes_nacimiento = cliente.fecha_nacimiento.month
+        cliente.dia_nacimiento = cliente.fecha_nacimiento.day
+        lote.append(cliente)
+        if len(lote) >= TAMANO_LOTE:
+            Cliente.objects.bulk_update(lote, ['mes_nacimiento', 'dia_nacimiento'])
+            lote = []
+    if lote:
+        Cliente.objects.bulk_update(lote, ['mes_nacimiento', 'dia_nacimiento'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catering', '0007_resumendiarioeventos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cliente',
+            name='dia_nacimiento',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Día de Nacimiento'),
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='mes_nacimiento',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Mes de Nacimiento'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['mes_nacimiento', 'dia_nacimiento'], name='cliente_cumpleanos_idx'),
+        ),
+        migrations.RunPython(cargar_mes_dia_nacimiento, migrations.RunPython.noop),
+    ]
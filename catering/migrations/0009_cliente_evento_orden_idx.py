@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catering', '0008_cliente_mes_dia_nacimiento'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['apellido', 'nombre', 'id_cliente'], name='cliente_apellido_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventosolicitado',
+            index=models.Index(fields=['fecha', 'id_evento'], name='evento_fecha_idx'),
+        ),
+    ]
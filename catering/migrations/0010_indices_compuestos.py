@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catering', '0009_cliente_evento_orden_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventosolicitado',
+            index=models.Index(fields=['fecha', 'estado'], name='evento_fecha_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventosolicitado',
+            index=models.Index(fields=['id_cliente', 'fecha'], name='evento_cliente_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventosolicitado',
+            index=models.Index(fields=['id_responsable', 'fecha'], name='evento_responsable_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='menuxtipoproducto',
+            index=models.Index(fields=['id_evento', 'precio_total'], name='menu_evento_total_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicio',
+            index=models.Index(fields=['id_personal', 'fecha_asignacion'], name='servicio_personal_fecha_idx'),
+        ),
+    ]
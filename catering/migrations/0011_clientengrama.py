@@ -0,0 +1,80 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Copia de ClienteNgrama.CAMPOS, LARGO y ngramas() al momento de esta migración
+CAMPOS = ['nombre', 'apellido', 'email', 'num_doc']
+LARGO = 3
+TAMANO_LOTE = 1000
+
+
+def ngramas(texto):
+    normalizado = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode().lower()
+    resultado = set()
+    for palabra in re.findall(r'[a-z0-9]+', normalizado):
+        if len(palabra) <= LARGO:
+            resultado.add(palabra)
+        else:
+            resultado.update(palabra[i:i + LARGO] for i in range(len(palabra) - LARGO + 1))
+    return resultado
+
+
+def indexar_clientes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        return
+    Cliente = apps.get_model('catering', 'Cliente')
+    ClienteNgrama = apps.get_model('catering', 'ClienteNgrama')
+    lote = []
+    for cliente in Cliente.objects.only(*CAMPOS).iterator(chunk_size=TAMANO_LOTE):
+        texto = ' '.join(getattr(cliente, campo) or '' for campo in CAMPOS)
+        lote.extend(ClienteNgrama(ngrama=ngrama, id_cliente_id=cliente.pk) for ngrama in ngramas(texto))
+        if len(lote) >= TAMANO_LOTE:
+            ClienteNgrama.objects.bulk_create(lote)
+            lote = []
+    if lote:
+        ClienteNgrama.objects.bulk_create(lote)
+
+
+def crear_indice_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE catering_cliente ADD FULLTEXT INDEX cliente_busqueda_ft '
+        '(nombre, apellido, email, num_doc) WITH PARSER ngram'
+    )
+
+
+def eliminar_indice_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('ALTER TABLE catering_cliente DROP INDEX cliente_busqueda_ft')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catering', '0010_indices_compuestos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClienteNgrama',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ngrama', models.CharField(max_length=3, verbose_name='N-grama')),
+                ('id_cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='catering.cliente', verbose_name='Cliente')),
+            ],
+            options={
+                'verbose_name': 'N-grama de Cliente',
+                'verbose_name_plural': 'N-gramas de Clientes',
+                'unique_together': {('ngrama', 'id_cliente')},
+            },
+        ),
+        migrations.RunPython(indexar_clientes, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice_fulltext, eliminar_indice_fulltext),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catering', '0011_clientengrama'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['nombre'], name='cliente_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='responsable',
+            index=models.Index(fields=['nombre_apellido', 'id_responsable'], name='responsable_nombre_idx'),
+        ),
+    ]
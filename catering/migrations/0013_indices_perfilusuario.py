@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catering', '0012_indices_autocompletar'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='perfilusuario',
+            index=models.Index(fields=['tipo_usuario', 'estado', 'usuario'], name='perfil_tipo_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='perfilusuario',
+            index=models.Index(fields=['tipo_usuario', 'usuario'], name='perfil_tipo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='perfilusuario',
+            index=models.Index(fields=['estado', 'usuario'], name='perfil_estado_idx'),
+        ),
+    ]
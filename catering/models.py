@@ -1,10 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.dispatch import Signal
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
 import re
+import unicodedata
+
+# Se emite con ids_eventos cuando se recalculan precios con update(), que no dispara post_save
+precios_recalculados = Signal()
 
 class Cliente(models.Model):
     """Modelo para gestionar los clientes de la empresa de catering"""
@@ -20,15 +25,35 @@ class Cliente(models.Model):
     barrio = models.ForeignKey('Barrio', on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Barrio")
     fecha_alta = models.DateField(auto_now_add=True, verbose_name="Fecha de Alta")
     fecha_nacimiento = models.DateField(null=True, blank=True, verbose_name="Fecha de Nacimiento")
+    # Copias de fecha_nacimiento que save() mantiene, para buscar cumpleaños por índice
+    mes_nacimiento = models.PositiveSmallIntegerField(null=True, blank=True, editable=False, verbose_name="Mes de Nacimiento")
+    dia_nacimiento = models.PositiveSmallIntegerField(null=True, blank=True, editable=False, verbose_name="Día de Nacimiento")
     usuario = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Usuario")
+
+    VOCALES = 'aeiouáéíóú'
     
     class Meta:
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
         ordering = ['apellido', 'nombre']
+        indexes = [
+            models.Index(fields=['mes_nacimiento', 'dia_nacimiento'], name='cliente_cumpleanos_idx'),
+            # Orden completo de cliente_list, para paginar por cursor
+            models.Index(fields=['apellido', 'nombre', 'id_cliente'], name='cliente_apellido_nombre_idx'),
+            # Búsqueda por prefijo del autocompletado (el apellido usa el índice anterior)
+            models.Index(fields=['nombre'], name='cliente_nombre_idx'),
+        ]
     
     def __str__(self):
         return f"{self.apellido}, {self.nombre}"
+
+    def save(self, *args, **kwargs):
+        self.mes_nacimiento = self.fecha_nacimiento.month if self.fecha_nacimiento else None
+        self.dia_nacimiento = self.fecha_nacimiento.day if self.fecha_nacimiento else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'fecha_nacimiento' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'mes_nacimiento', 'dia_nacimiento'}
+        super().save(*args, **kwargs)
     
     def get_edad(self):
         """Calcula la edad del cliente basada en la fecha de nacimiento"""
@@ -39,7 +64,7 @@ class Cliente(models.Model):
     def tiene_vocal_segunda_letra(self):
         """Verifica si el nombre tiene una vocal como segunda letra"""
         if len(self.nombre) >= 2:
-            return self.nombre[1].lower() in 'aeiouáéíóú'
+            return self.nombre[1].lower() in self.VOCALES
         return False
     
     def crear_usuario(self, username=None, password=None):
@@ -77,6 +102,54 @@ class Cliente(models.Model):
         
         return user
 
+class ClienteNgrama(models.Model):
+    """
+    Índice invertido de trigramas de los datos de búsqueda de cada cliente.
+    Se usa para buscar clientes en las bases sin índice FULLTEXT (SQLite, tests).
+    """
+    CAMPOS = ['nombre', 'apellido', 'email', 'num_doc']
+    LARGO = 3
+
+    ngrama = models.CharField(max_length=3, verbose_name="N-grama")
+    id_cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, verbose_name="Cliente")
+
+    class Meta:
+        verbose_name = "N-grama de Cliente"
+        verbose_name_plural = "N-gramas de Clientes"
+        unique_together = ['ngrama', 'id_cliente']
+
+    def __str__(self):
+        return f"{self.ngrama} - {self.id_cliente_id}"
+
+    @classmethod
+    def palabras(cls, texto):
+        """Palabras en minúsculas y sin acentos, para que 'perez' encuentre 'Pérez'"""
+        normalizado = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode().lower()
+        return re.findall(r'[a-z0-9]+', normalizado)
+
+    @classmethod
+    def ngramas(cls, texto):
+        """Trigramas de cada palabra; las palabras más cortas quedan enteras"""
+        ngramas = set()
+        for palabra in cls.palabras(texto):
+            if len(palabra) <= cls.LARGO:
+                ngramas.add(palabra)
+            else:
+                ngramas.update(palabra[i:i + cls.LARGO] for i in range(len(palabra) - cls.LARGO + 1))
+        return ngramas
+
+    @classmethod
+    def indexar(cls, clientes):
+        """Reemplaza los trigramas de los clientes indicados"""
+        clientes = list(clientes)
+        with transaction.atomic():
+            cls.objects.filter(id_cliente__in=clientes).delete()
+            cls.objects.bulk_create([
+                cls(ngrama=ngrama, id_cliente=cliente)
+                for cliente in clientes
+                for ngrama in cls.ngramas(' '.join(getattr(cliente, campo) or '' for campo in cls.CAMPOS))
+            ], batch_size=1000)
+
 class Responsable(models.Model):
     """Modelo para gestionar los responsables de servicios"""
     id_responsable = models.AutoField(primary_key=True)
@@ -89,6 +162,9 @@ class Responsable(models.Model):
         verbose_name = "Responsable"
         verbose_name_plural = "Responsables"
         ordering = ['nombre_apellido']
+        indexes = [
+            models.Index(fields=['nombre_apellido', 'id_responsable'], name='responsable_nombre_idx'),
+        ]
     
     def __str__(self):
         return self.nombre_apellido
@@ -140,6 +216,19 @@ class Comprobante(models.Model):
     def __str__(self):
         return f"Comprobante {self.id_comprobante} - {self.id_cliente}"
     
+    @staticmethod
+    def calcular_totales(importe_total_productos, cantidad_personas):
+        """Aplica el recargo del servicio (30%) y calcula el precio por persona"""
+        centavos = Decimal('0.01')
+        importe_total_productos = Decimal(importe_total_productos)
+        total_servicio = importe_total_productos * Decimal('1.3')
+        precio_x_persona = total_servicio / cantidad_personas if cantidad_personas and cantidad_personas > 0 else Decimal('0')
+        return {
+            'importe_total_productos': importe_total_productos.quantize(centavos),
+            'total_servicio': total_servicio.quantize(centavos),
+            'precio_x_persona': precio_x_persona.quantize(centavos),
+        }
+    
     def save(self, *args, **kwargs):
         if not self.fecha_vigencia:
             self.fecha_vigencia = self.fecha_pedido + timedelta(days=10)
@@ -163,6 +252,9 @@ class EventoSolicitado(models.Model):
         ('VENCIDO', 'Vencido'),
     ]
     
+    ESTADOS_ACTIVOS = ['SOLICITADO', 'CONFIRMADO', 'EN_PROCESO']
+    MAX_EVENTOS_POR_DIA = 10
+    
     id_evento = models.AutoField(primary_key=True)
     id_cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, verbose_name="Cliente")
     id_responsable = models.ForeignKey(Responsable, on_delete=models.CASCADE, verbose_name="Responsable")
@@ -185,18 +277,48 @@ class EventoSolicitado(models.Model):
         verbose_name = "Evento Solicitado"
         verbose_name_plural = "Eventos Solicitados"
         ordering = ['fecha', 'hora']
+        indexes = [
+            # Orden completo de evento_list, para paginar por cursor
+            models.Index(fields=['fecha', 'id_evento'], name='evento_fecha_idx'),
+            # Disponibilidad de una fecha (eventos activos del día)
+            models.Index(fields=['fecha', 'estado'], name='evento_fecha_estado_idx'),
+            # Eventos de un cliente y de un responsable, ordenados por fecha
+            models.Index(fields=['id_cliente', 'fecha'], name='evento_cliente_fecha_idx'),
+            models.Index(fields=['id_responsable', 'fecha'], name='evento_responsable_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"Evento {self.id_evento} - {self.tipo_evento} - {self.fecha}"
     
     def verificar_disponibilidad(self):
         """Verifica si hay disponibilidad para la fecha y hora del evento"""
-        eventos_mismo_dia = EventoSolicitado.objects.filter(
-            fecha=self.fecha,
-            estado__in=['SOLICITADO', 'CONFIRMADO', 'EN_PROCESO']
-        ).exclude(id_evento=self.id_evento)
+        eventos_mismo_dia = OcupacionDiaria.eventos_en_fecha(self.fecha)
+        if self.id_evento:
+            # El propio evento solo está contado si lo guardado es un evento activo en esta
+            # misma fecha; se mira la fila y no la instancia, que puede traer cambios sin guardar
+            ya_contado = EventoSolicitado.objects.filter(
+                pk=self.id_evento, fecha=self.fecha, estado__in=self.ESTADOS_ACTIVOS
+            ).exists()
+            if ya_contado:
+                eventos_mismo_dia -= 1
         
-        return eventos_mismo_dia.count() < 10
+        return eventos_mismo_dia < self.MAX_EVENTOS_POR_DIA
+    
+    def preparar_cupo(self):
+        """Deja lista la fila de ocupación de la fecha; se llama fuera de la transacción de la reserva"""
+        OcupacionDiaria.crear_fecha(self.fecha)
+
+    def reservar_cupo(self):
+        """
+        Reserva atómicamente el lugar de un evento nuevo en su fecha.
+        Debe llamarse dentro de transaction.atomic() antes de guardar el evento,
+        después de preparar_cupo() fuera de ese bloque; devuelve False si el día
+        ya está completo.
+        """
+        if not OcupacionDiaria.reservar_lugar(self.fecha, self.MAX_EVENTOS_POR_DIA):
+            return False
+        self._cupo_reservado = True
+        return True
     
     def get_porcentaje_sena(self):
         """Calcula el porcentaje de seña sobre el precio total"""
@@ -218,19 +340,209 @@ class EventoSolicitado(models.Model):
         return self.ubicacion
     
     def calcular_precios(self):
-        """Calcula los precios totales basados en el menú"""
-        menu_items = MenuXTipoProducto.objects.filter(id_evento=self)
-        total_productos = sum(item.precio_total for item in menu_items)
+        """
+        Recalcula los precios del comprobante y del evento a partir del menú.
+        El total de productos se suma en la base de datos y solo se escriben
+        los campos de precio, ambos en una misma transacción.
+        """
+        total_productos = MenuXTipoProducto.objects.filter(
+            id_evento_id=self.pk
+        ).aggregate(total=models.Sum('precio_total'))['total'] or Decimal('0')
+        totales = Comprobante.calcular_totales(total_productos, self.cantidad_personas)
+        
+        with transaction.atomic():
+            Comprobante.objects.filter(pk=self.id_comprobante_id).update(**totales)
+            EventoSolicitado.objects.filter(pk=self.pk).update(
+                precio_total=totales['total_servicio'],
+                precio_por_persona=totales['precio_x_persona']
+            )
         
-        if hasattr(self, 'id_comprobante'):
-            self.id_comprobante.importe_total_productos = total_productos
-            self.id_comprobante.total_servicio = total_productos * Decimal('1.3')
-            self.id_comprobante.precio_x_persona = self.id_comprobante.total_servicio / self.cantidad_personas if self.cantidad_personas > 0 else 0
-            self.id_comprobante.save()
-            
-            self.precio_total = self.id_comprobante.total_servicio
-            self.precio_por_persona = self.id_comprobante.precio_x_persona
-            self.save()
+        if EventoSolicitado.id_comprobante.is_cached(self):
+            for campo, valor in totales.items():
+                setattr(self.id_comprobante, campo, valor)
+        self.precio_total = totales['total_servicio']
+        self.precio_por_persona = totales['precio_x_persona']
+        precios_recalculados.send(sender=EventoSolicitado, ids_eventos=[self.pk])
+
+class OcupacionDiaria(models.Model):
+    """Cantidad de eventos activos por fecha, mantenida por señales de EventoSolicitado"""
+    fecha = models.DateField(primary_key=True, verbose_name="Fecha")
+    eventos_activos = models.PositiveIntegerField(default=0, verbose_name="Eventos Activos")
+    
+    class Meta:
+        verbose_name = "Ocupación Diaria"
+        verbose_name_plural = "Ocupaciones Diarias"
+        ordering = ['fecha']
+    
+    def __str__(self):
+        return f"{self.fecha} - {self.eventos_activos} eventos"
+    
+    @classmethod
+    def eventos_en_fecha(cls, fecha):
+        """Devuelve la cantidad de eventos activos de una fecha (una búsqueda por clave primaria)"""
+        ocupacion = cls.objects.filter(fecha=fecha).values_list('eventos_activos', flat=True).first()
+        return ocupacion or 0
+    
+    @classmethod
+    def eventos_en_rango(cls, desde, hasta):
+        """Devuelve {fecha: eventos activos} para las fechas con ocupación del rango"""
+        return dict(
+            cls.objects.filter(
+                fecha__gte=desde, fecha__lte=hasta, eventos_activos__gt=0
+            ).values_list('fecha', 'eventos_activos')
+        )
+    
+    @classmethod
+    def crear_fecha(cls, fecha):
+        """
+        Crea la fila de la fecha si todavía no existe, en su propia transacción.
+        Se llama antes del bloque atómico que reserva el lugar: en MySQL (REPEATABLE
+        READ) dos reservas que buscan una fila inexistente toman el mismo gap lock y,
+        al insertarla ambas, una termina en deadlock (error 1213).
+        """
+        # get_or_create ya resuelve el caso de otra reserva que la crea al mismo tiempo
+        cls.objects.get_or_create(fecha=fecha)
+
+    @classmethod
+    def reservar_lugar(cls, fecha, maximo):
+        """
+        Incrementa la ocupación solo si la fecha tiene cupo. El UPDATE condicional
+        bloquea únicamente la fila de esa fecha, por lo que las reservas concurrentes
+        del mismo día se serializan sin bloquear el resto de la tabla. La fila debe
+        existir de antemano (crear_fecha).
+        """
+        return cls.objects.filter(fecha=fecha, eventos_activos__lt=maximo).update(
+            eventos_activos=models.F('eventos_activos') + 1
+        ) == 1
+    
+    @classmethod
+    def ajustar(cls, fecha, delta):
+        """Suma delta a la ocupación de la fecha de forma atómica"""
+        if not fecha or not delta:
+            return
+        cls.objects.get_or_create(fecha=fecha)
+        cls.objects.filter(fecha=fecha).update(
+            eventos_activos=models.F('eventos_activos') + delta
+        )
+    
+    @classmethod
+    def conteo_real(cls):
+        """Calcula la ocupación por fecha directamente desde EventoSolicitado"""
+        return dict(
+            EventoSolicitado.objects.filter(
+                estado__in=EventoSolicitado.ESTADOS_ACTIVOS
+            ).values('fecha').annotate(
+                total=models.Count('id_evento')
+            ).values_list('fecha', 'total')
+        )
+
+class ResumenDiarioEventos(models.Model):
+    """
+    Totales diarios de eventos por tipo, estado y responsable para los gráficos
+    de los dashboards. Lo actualiza el comando actualizar_resumen_eventos.
+    """
+    fecha = models.DateField(verbose_name="Fecha")
+    tipo_evento = models.CharField(max_length=20, choices=EventoSolicitado.TIPO_EVENTO_CHOICES, verbose_name="Tipo de Evento")
+    estado = models.CharField(max_length=20, choices=EventoSolicitado.ESTADO_CHOICES, verbose_name="Estado")
+    id_responsable = models.ForeignKey(Responsable, on_delete=models.CASCADE, verbose_name="Responsable")
+    cantidad_eventos = models.PositiveIntegerField(default=0, verbose_name="Cantidad de Eventos")
+    total_personas = models.PositiveIntegerField(default=0, verbose_name="Total de Personas")
+    total_precio = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Total Facturado")
+    total_senas = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Total de Señas")
+    
+    class Meta:
+        verbose_name = "Resumen Diario de Eventos"
+        verbose_name_plural = "Resúmenes Diarios de Eventos"
+        ordering = ['fecha']
+        unique_together = ['fecha', 'tipo_evento', 'estado', 'id_responsable']
+    
+    def __str__(self):
+        return f"{self.fecha} - {self.tipo_evento} - {self.estado} - {self.cantidad_eventos} eventos"
+    
+    @classmethod
+    def filas_desde_eventos(cls, eventos):
+        """Agrupa un queryset de eventos en filas del resumen (sin guardarlas)"""
+        grupos = eventos.values('fecha', 'tipo_evento', 'estado', 'id_responsable').annotate(
+            cantidad=models.Count('id_evento'),
+            personas=models.Sum('cantidad_personas'),
+            precio=models.Sum('precio_total'),
+            senas=models.Sum('monto_sena'),
+        ).order_by()
+        return [
+            cls(
+                fecha=grupo['fecha'],
+                tipo_evento=grupo['tipo_evento'],
+                estado=grupo['estado'],
+                id_responsable_id=grupo['id_responsable'],
+                cantidad_eventos=grupo['cantidad'],
+                total_personas=grupo['personas'] or 0,
+                total_precio=grupo['precio'] or 0,
+                total_senas=grupo['senas'] or 0,
+            )
+            for grupo in grupos
+        ]
+    
+    @classmethod
+    def recalcular_fechas(cls, fechas):
+        """Reemplaza las filas de las fechas indicadas por los totales actuales de los eventos"""
+        fechas = list(fechas)
+        filas = cls.filas_desde_eventos(EventoSolicitado.objects.filter(fecha__in=fechas))
+        with transaction.atomic():
+            cls.objects.filter(fecha__in=fechas).delete()
+            cls.objects.bulk_create(filas, batch_size=1000)
+        return len(filas)
+    
+    @classmethod
+    def actualizar_pendientes(cls, lote=500):
+        """
+        Recalcula las fechas marcadas en FechaResumenPendiente, de a `lote` fechas por
+        transacción. Devuelve (fechas recalculadas, filas generadas).
+        """
+        total_fechas = 0
+        total_filas = 0
+        # Sin fechas pendientes no se abre ninguna transacción
+        while FechaResumenPendiente.objects.exists():
+            with transaction.atomic():
+                # Se quitan las marcas antes de recalcular: un cambio concurrente vuelve a marcar la fecha
+                fechas = list(
+                    FechaResumenPendiente.objects.select_for_update()
+                    .order_by('fecha').values_list('fecha', flat=True)[:lote]
+                )
+                if not fechas:
+                    break
+                FechaResumenPendiente.objects.filter(fecha__in=fechas).delete()
+                total_filas += cls.recalcular_fechas(fechas)
+            total_fechas += len(fechas)
+        return total_fechas, total_filas
+    
+    @classmethod
+    def reconstruir(cls):
+        """Vuelve a generar el resumen completo desde EventoSolicitado"""
+        filas = cls.filas_desde_eventos(EventoSolicitado.objects.all())
+        with transaction.atomic():
+            cls.objects.all().delete()
+            FechaResumenPendiente.objects.all().delete()
+            cls.objects.bulk_create(filas, batch_size=1000)
+        return len(filas)
+
+class FechaResumenPendiente(models.Model):
+    """Fechas con eventos modificados desde la última actualización del resumen diario"""
+    fecha = models.DateField(primary_key=True, verbose_name="Fecha")
+    
+    class Meta:
+        verbose_name = "Fecha de Resumen Pendiente"
+        verbose_name_plural = "Fechas de Resumen Pendientes"
+    
+    def __str__(self):
+        return str(self.fecha)
+    
+    @classmethod
+    def marcar(cls, fechas):
+        """Registra fechas a recalcular; las ya pendientes se ignoran"""
+        cls.objects.bulk_create(
+            [cls(fecha=fecha) for fecha in set(fechas) if fecha],
+            ignore_conflicts=True
+        )
 
 class MenuXTipoProducto(models.Model):
     """Modelo para los menús personalizados por tipo de producto"""
@@ -246,6 +558,10 @@ class MenuXTipoProducto(models.Model):
         verbose_name = "Menú por Tipo de Producto"
         verbose_name_plural = "Menús por Tipo de Producto"
         unique_together = ['id_evento', 'id_tipo_producto', 'id_producto']
+        indexes = [
+            # Cubre la suma del menú por evento al recalcular precios, sin leer las filas
+            models.Index(fields=['id_evento', 'precio_total'], name='menu_evento_total_idx'),
+        ]
     
     def __str__(self):
         return f"{self.id_evento} - {self.id_producto} - {self.cantidad_producto}"
@@ -255,6 +571,46 @@ class MenuXTipoProducto(models.Model):
             self.precio_uni = self.id_producto.precio
         self.precio_total = self.precio_uni * self.cantidad_producto
         super().save(*args, **kwargs)
+    
+    @classmethod
+    def guardar_lote(cls, evento, cantidades):
+        """
+        Agrega o actualiza varios productos del menú de un evento.
+        cantidades es un diccionario {id_producto: cantidad}; los productos que ya
+        están en el menú toman la nueva cantidad y conservan su precio unitario.
+        Devuelve (creados, actualizados) y recalcula los precios una sola vez.
+        """
+        productos = Producto.objects.in_bulk(list(cantidades))
+        existentes = {
+            item.id_producto_id: item
+            for item in cls.objects.filter(id_evento=evento, id_producto_id__in=list(cantidades))
+        }
+        
+        nuevos = []
+        actualizados = []
+        for id_producto, cantidad in cantidades.items():
+            item = existentes.get(id_producto)
+            if item:
+                item.cantidad_producto = cantidad
+                item.precio_total = item.precio_uni * cantidad
+                actualizados.append(item)
+            else:
+                producto = productos[id_producto]
+                nuevos.append(cls(
+                    id_evento=evento,
+                    id_tipo_producto_id=producto.id_tipo_producto_id,
+                    id_producto=producto,
+                    cantidad_producto=cantidad,
+                    precio_uni=producto.precio,
+                    precio_total=producto.precio * cantidad,
+                ))
+        
+        with transaction.atomic():
+            cls.objects.bulk_create(nuevos)
+            cls.objects.bulk_update(actualizados, ['cantidad_producto', 'precio_total'])
+            evento.calcular_precios()
+        
+        return len(nuevos), len(actualizados)
 
 class Senia(models.Model):
     """Modelo para gestionar las señas de los eventos"""
@@ -264,6 +620,8 @@ class Senia(models.Model):
         ('VENCIDA', 'Vencida'),
     ]
     
+    PORCENTAJE_SENIA = Decimal('0.30')
+    
     id_senia = models.AutoField(primary_key=True)
     id_evento = models.OneToOneField(EventoSolicitado, on_delete=models.CASCADE, verbose_name="Evento")
     monto = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Monto")
@@ -279,7 +637,7 @@ class Senia(models.Model):
     
     def calcular_monto(self):
         """Calcula el monto de la seña (30% del total del servicio)"""
-        return self.id_evento.id_comprobante.total_servicio * Decimal('0.30')
+        return self.id_evento.id_comprobante.total_servicio * self.PORCENTAJE_SENIA
     
     def save(self, *args, **kwargs):
         if not self.monto:
@@ -332,6 +690,10 @@ class Servicio(models.Model):
         verbose_name = "Servicio"
         verbose_name_plural = "Servicios"
         ordering = ['-fecha_asignacion']
+        indexes = [
+            # Servicios de un trabajador en el orden de sus listados
+            models.Index(fields=['id_personal', 'fecha_asignacion'], name='servicio_personal_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"{self.id_personal} - {self.id_evento}"
@@ -365,6 +727,12 @@ class PerfilUsuario(models.Model):
         verbose_name = "Perfil de Usuario"
         verbose_name_plural = "Perfiles de Usuario"
         ordering = ['usuario__username']
+        indexes = [
+            # Filtros de gestion_usuarios; terminan en usuario para recorrer el orden de la página
+            models.Index(fields=['tipo_usuario', 'estado', 'usuario'], name='perfil_tipo_estado_idx'),
+            models.Index(fields=['tipo_usuario', 'usuario'], name='perfil_tipo_idx'),
+            models.Index(fields=['estado', 'usuario'], name='perfil_estado_idx'),
+        ]
     
     def __str__(self):
         return f"{self.usuario.username} - {self.get_tipo_usuario_display()}"
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from .roles import rol_de_usuario
+from .models import Cliente, Personal, Responsable
+
+TAMANO_COLA = 100
+
+class Suscripcion:
+    """Cola de avisos de un cliente conectado, ligada al event loop que la consume"""
+
+    def __init__(self, broker, alcances):
+        self.broker = broker
+        self.alcances = set(alcances)
+        self.loop = asyncio.get_running_loop()
+        self.cola = asyncio.Queue(maxsize=TAMANO_COLA)
+
+    def interesa(self, aviso):
+        return bool(self.alcances & set(aviso['alcances']))
+
+    def entregar(self, aviso):
+        """Encola un aviso desde cualquier hilo"""
+        try:
+            self.loop.call_soon_threadsafe(self._encolar, aviso)
+        except RuntimeError:
+            # El loop ya se cerró: el cliente se desconectó sin cancelar
+            self.cerrar()
+
+    def _encolar(self, aviso):
+        if self.cola.full():
+            # Un cliente lento pierde los avisos más viejos; el panel se resincroniza igual
+            self.cola.get_nowait()
+        self.cola.put_nowait(aviso)
+
+    async def siguiente(self, espera):
+        """Próximo aviso, o None si no llegó ninguno en `espera` segundos"""
+        try:
+            return await asyncio.wait_for(self.cola.get(), espera)
+        except asyncio.TimeoutError:
+            return None
+
+    def cerrar(self):
+        self.broker.cancelar(self)
+
+class BrokerEnMemoria:
+    """
+    Reparte los avisos entre las conexiones abiertas en este mismo proceso.
+    Alcanza con un único worker ASGI.
+    """
+
+    def __init__(self):
+        self._suscripciones = set()
+        self._lock = threading.Lock()
+
+    def suscribir(self, alcances):
+        suscripcion = Suscripcion(self, alcances)
+        with self._lock:
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def publicar(self, aviso):
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            if suscripcion.interesa(aviso):
+                suscripcion.entregar(aviso)
+
+class SuscripcionCache(Suscripcion):
+    """Suscripción que lee los avisos publicados en la caché compartida"""
+
+    INTERVALO_LECTURA = 1
+
+    def __init__(self, broker, alcances):
+        super().__init__(broker, alcances)
+        self.ultima = broker.secuencia_actual()
+
+    async def siguiente(self, espera):
+        restante = espera
+        while restante > 0:
+            if self.cola.empty():
+                for aviso in await sync_to_async(self.broker.leer_desde)(self.ultima):
+                    self.ultima = aviso['secuencia']
+                    if self.interesa(aviso):
+                        self._encolar(aviso)
+            if not self.cola.empty():
+                return self.cola.get_nowait()
+            await asyncio.sleep(self.INTERVALO_LECTURA)
+            restante -= self.INTERVALO_LECTURA
+        return None
+
+class BrokerCache:
+    """
+    Alternativa para varios workers: los avisos se numeran y se guardan un minuto en
+    la caché de Django, y cada conexión lee los nuevos una vez por segundo. Requiere
+    una caché compartida entre procesos (Redis, Memcached, base de datos).
+    """
+
+    CLAVE_SECUENCIA = 'notificaciones:secuencia'
+    TTL_AVISO = 60
+
+    def secuencia_actual(self):
+        return cache.get(self.CLAVE_SECUENCIA, 0)
+
+    def suscribir(self, alcances):
+        return SuscripcionCache(self, alcances)
+
+    def cancelar(self, suscripcion):
+        pass
+
+    def publicar(self, aviso):
+        cache.add(self.CLAVE_SECUENCIA, 0, timeout=None)
+        secuencia = cache.incr(self.CLAVE_SECUENCIA)
+        cache.set(f'notificaciones:aviso:{secuencia}', dict(aviso, secuencia=secuencia), self.TTL_AVISO)
+
+    def leer_desde(self, ultima):
+        actual = self.secuencia_actual()
+        if actual <= ultima:
+            return []
+        # Tras un corte largo solo interesan los avisos que la caché todavía conserva
+        desde = max(ultima + 1, actual - TAMANO_COLA + 1)
+        claves = [f'notificaciones:aviso:{secuencia}' for secuencia in range(desde, actual + 1)]
+        avisos = cache.get_many(claves)
+        return [avisos[clave] for clave in claves if clave in avisos]
+
+BROKERS = {
+    'memoria': BrokerEnMemoria,
+    'cache': BrokerCache,
+}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+def obtener_broker():
+    """Broker configurado en NOTIFICACIONES_BROKER ('memoria' por defecto o 'cache')"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = BROKERS[getattr(settings, 'NOTIFICACIONES_BROKER', 'memoria')]()
+    return _broker
+
+def publicar_aviso(tipo, datos, alcances):
+    """
+    Publica un aviso para los alcances indicados (y los administradores) cuando
+    confirma la transacción en curso
+    """
+    aviso = {
+        'tipo': tipo,
+        'datos': datos,
+        'alcances': sorted({alcance for alcance in alcances if alcance} | {'admin'}),
+    }
+    transaction.on_commit(lambda: obtener_broker().publicar(aviso))
+
+def alcances_de_usuario(usuario):
+    """Alcances de avisos que puede recibir un usuario según su perfil"""
+    perfil = rol_de_usuario(usuario)
+    if usuario.is_superuser or (perfil and perfil.es_admin()):
+        return {'admin'}
+    if not perfil:
+        return set()
+
+    if perfil.tipo_usuario == 'RESPONSABLE':
+        ids = Responsable.objects.filter(usuario=usuario).values_list('id_responsable', flat=True)
+        return {f'responsable:{id_responsable}' for id_responsable in ids}
+    if perfil.tipo_usuario == 'EMPLEADO':
+        ids = Personal.objects.filter(usuario=usuario).values_list('id_personal', flat=True)
+        return {f'personal:{id_personal}' for id_personal in ids}
+    if perfil.tipo_usuario == 'CLIENTE':
+        ids = Cliente.objects.filter(usuario=usuario).values_list('id_cliente', flat=True)
+        return {f'cliente:{id_cliente}' for id_cliente in ids}
+    return set()
@@ -0,0 +1,125 @@
+import base64
+import binascii
+import json
+from django.db.models import Q
+
+# El total opcional se cuenta hasta este límite; más allá se informa "más de"
+LIMITE_CONTEO = 1000
+
+def _codificar(valores):
+    datos = json.dumps(valores, default=str, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip('=')
+
+def _decodificar(cursor, cantidad):
+    if not cursor:
+        return None
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        return None
+    return valores
+
+def _nombre(campo):
+    return campo.lstrip('-')
+
+def _invertir(campo):
+    return _nombre(campo) if campo.startswith('-') else f'-{campo}'
+
+def _filtro_seek(orden, valores, hacia_adelante):
+    """
+    Filas posteriores (o anteriores) a `valores` según `orden`, como
+    a >= x AND ((a > x) OR (a = x AND b > y) OR ...). La cota redundante sobre la
+    primera columna es la que permite al motor empezar el rango dentro del índice.
+    """
+    condicion = Q()
+    iguales = {}
+    for campo, valor in zip(orden, valores):
+        descendente = campo.startswith('-')
+        operador = 'lt' if descendente == hacia_adelante else 'gt'
+        condicion |= Q(**iguales, **{f'{_nombre(campo)}__{operador}': valor})
+        iguales[_nombre(campo)] = valor
+    primero = orden[0]
+    cota = 'lte' if primero.startswith('-') == hacia_adelante else 'gte'
+    return Q(**{f'{_nombre(primero)}__{cota}': valores[0]}) & condicion
+
+class PaginaCursor:
+    """
+    Página de una paginación por cursor. Se itera como la Page de Paginator y
+    expone las querystrings de la página anterior y siguiente.
+    """
+
+    def __init__(self, objetos, orden, parametros, hay_anterior, hay_siguiente, total=None, total_aproximado=False):
+        self.object_list = objetos
+        self.orden = orden
+        self.parametros = parametros
+        self.has_previous = hay_anterior
+        self.has_next = hay_siguiente
+        self.total = total
+        self.total_aproximado = total_aproximado
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_other_pages(self):
+        return self.has_previous or self.has_next
+
+    def _valores(self, objeto):
+        return [getattr(objeto, _nombre(campo)) for campo in self.orden]
+
+    def _query(self, clave, objeto):
+        parametros = self.parametros.copy()
+        parametros[clave] = _codificar(self._valores(objeto))
+        return parametros.urlencode()
+
+    def query_anterior(self):
+        return self._query('antes', self.object_list[0]) if self.has_previous and self.object_list else ''
+
+    def query_siguiente(self):
+        return self._query('despues', self.object_list[-1]) if self.has_next and self.object_list else ''
+
+    def query_contar(self):
+        parametros = self.parametros.copy()
+        parametros['contar'] = '1'
+        return parametros.urlencode()
+
+def paginar_por_cursor(request, queryset, orden, por_pagina):
+    """
+    Pagina `queryset` por los valores de `orden` (que debe terminar en la clave
+    primaria) en lugar de LIMIT/OFFSET: cada página busca directamente a partir de
+    la última fila vista, sin COUNT(*). Lee los cursores 'antes' y 'despues' del
+    request; con contar=1 agrega un total acotado a LIMITE_CONTEO.
+    """
+    parametros = request.GET.copy()
+    antes = _decodificar(parametros.pop('antes', [None])[-1], len(orden))
+    despues = _decodificar(parametros.pop('despues', [None])[-1], len(orden))
+
+    if antes is not None:
+        filas = list(
+            queryset.filter(_filtro_seek(orden, antes, False)).order_by(*map(_invertir, orden))[:por_pagina + 1]
+        )
+        hay_anterior = len(filas) > por_pagina
+        objetos = filas[:por_pagina][::-1]
+        hay_siguiente = True
+    else:
+        pendientes = queryset
+        if despues is not None:
+            pendientes = pendientes.filter(_filtro_seek(orden, despues, True))
+        filas = list(pendientes.order_by(*orden)[:por_pagina + 1])
+        hay_siguiente = len(filas) > por_pagina
+        objetos = filas[:por_pagina]
+        hay_anterior = despues is not None
+
+    total = None
+    total_aproximado = False
+    if request.GET.get('contar') == '1':
+        # COUNT sobre una subconsulta con LIMIT: el costo queda acotado aunque crezca la tabla
+        total = queryset.order_by()[:LIMITE_CONTEO + 1].count()
+        total_aproximado = total > LIMITE_CONTEO
+        total = min(total, LIMITE_CONTEO)
+    return PaginaCursor(objetos, orden, parametros, hay_anterior, hay_siguiente, total, total_aproximado)
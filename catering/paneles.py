@@ -0,0 +1,87 @@
+import hashlib
+import time
+from django.core.cache import cache
+from django.db import transaction
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from .models import EventoSolicitado, Servicio
+
+PREFIJO_VERSION = 'paneles:version'
+
+def _clave_version(alcance):
+    return f'{PREFIJO_VERSION}:{alcance}'
+
+def _nueva_version():
+    # Se parte de la hora actual para que una caché vaciada no repita versiones ya entregadas
+    return time.time_ns()
+
+def version_paneles(*alcances):
+    """
+    Versión combinada de los alcances de un panel (p. ej. 'personal:3', 'responsable:5').
+    Solo consulta la caché, nunca la base de datos.
+    """
+    claves = [_clave_version(alcance) for alcance in alcances]
+    versiones = cache.get_many(claves)
+    for clave in claves:
+        if clave not in versiones:
+            cache.add(clave, _nueva_version(), timeout=None)
+            versiones[clave] = cache.get(clave)
+    return ':'.join(str(versiones[clave]) for clave in claves)
+
+def _incrementar_versiones(alcances):
+    for alcance in alcances:
+        clave = _clave_version(alcance)
+        try:
+            cache.incr(clave)
+        except ValueError:
+            cache.set(clave, _nueva_version(), timeout=None)
+
+def registrar_cambio_paneles(alcances):
+    """Invalida los ETag de los paneles afectados cuando confirma la transacción"""
+    alcances = {alcance for alcance in alcances if alcance}
+    if alcances:
+        transaction.on_commit(lambda: _incrementar_versiones(alcances))
+
+def alcances_de_eventos(ids_eventos):
+    """Alcances de panel (responsables y personal asignado) de un conjunto de eventos"""
+    ids_eventos = list(ids_eventos)
+    responsables = EventoSolicitado.objects.filter(
+        pk__in=ids_eventos, id_responsable__isnull=False
+    ).values_list('id_responsable_id', flat=True).distinct()
+    personal = Servicio.objects.filter(
+        id_evento_id__in=ids_eventos
+    ).values_list('id_personal_id', flat=True).distinct()
+    return (
+        {f'responsable:{id_responsable}' for id_responsable in responsables}
+        | {f'personal:{id_personal}' for id_personal in personal}
+    )
+
+def datos_evento(evento):
+    """Campos de un evento que los paneles actualizan sin recargar la página"""
+    return {
+        'id': evento.pk,
+        'tipo_evento': evento.get_tipo_evento_display(),
+        'estado': evento.estado,
+        'estado_display': evento.get_estado_display(),
+        'fecha': evento.fecha.strftime('%d/%m/%Y'),
+        'hora': evento.hora.strftime('%H:%M'),
+        'ubicacion': evento.ubicacion,
+        'cantidad_personas': evento.cantidad_personas,
+        'precio_total': f'{evento.precio_total or 0:.0f}',
+    }
+
+def respuesta_panel(request, alcances, construir):
+    """
+    JsonResponse de un panel con ETag derivado de las versiones de sus alcances.
+    Si el cliente ya tiene la versión vigente se responde 304 sin llamar a construir().
+    """
+    firma = f'{request.get_full_path()}|{timezone.now().date()}|{version_paneles(*alcances)}'
+    etag = quote_etag(hashlib.md5(firma.encode()).hexdigest())
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(construir())
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,171 @@
+import threading
+from decimal import Decimal
+from functools import partial
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+from .models import Comprobante, EventoSolicitado, MenuXTipoProducto, Producto, Senia, precios_recalculados
+
+ESTADOS_REPRECIABLES = ['SOLICITADO', 'CONFIRMADO']
+
+_pendientes = threading.local()
+
+def _eventos_pendientes():
+    if not hasattr(_pendientes, 'ids'):
+        _pendientes.ids = set()
+    return _pendientes.ids
+
+def marcar_para_recalculo(id_evento):
+    """
+    Encola un evento para recalcular sus precios al confirmar la transacción.
+    Dentro de un bloque atómico, varios cambios sobre el menú de un mismo evento
+    producen un único recálculo; fuera de él se recalcula inmediatamente.
+    """
+    _eventos_pendientes().add(id_evento)
+    # Un callback por cambio: si el bloque se revierte Django descarta el suyo, y los
+    # cambios posteriores registran uno propio en lugar de depender de aquel
+    transaction.on_commit(partial(recalcular_pendientes, id_evento))
+
+def recalcular_pendientes(id_evento):
+    """
+    Recalcula una vez cada evento encolado por marcar_para_recalculo. El primer
+    callback de la transacción procesa todos los encolados; los siguientes ya no
+    encuentran su evento y no hacen nada. Los eventos que quedaron de un bloque
+    revertido se recalculan de más, lo que no cambia su resultado.
+    """
+    pendientes = _eventos_pendientes()
+    if id_evento not in pendientes:
+        return
+    ids = list(pendientes)
+    pendientes.clear()
+    recalcular_eventos(ids)
+
+def recalcular_eventos(ids_eventos, tamano_lote=500):
+    """
+    Recalcula comprobante y precios de varios eventos con las reglas de
+    Comprobante.calcular_totales, usando una suma agrupada y dos bulk_update por lote.
+    """
+    ids_eventos = list(ids_eventos)
+    for inicio in range(0, len(ids_eventos), tamano_lote):
+        lote = ids_eventos[inicio:inicio + tamano_lote]
+        totales_productos = dict(
+            MenuXTipoProducto.objects.filter(id_evento_id__in=lote)
+            .values('id_evento').annotate(total=Sum('precio_total'))
+            .order_by().values_list('id_evento', 'total')
+        )
+
+        eventos = []
+        comprobantes = []
+        for id_evento, id_comprobante, cantidad_personas in EventoSolicitado.objects.filter(
+            pk__in=lote
+        ).values_list('id_evento', 'id_comprobante_id', 'cantidad_personas'):
+            totales = Comprobante.calcular_totales(
+                totales_productos.get(id_evento) or Decimal('0'), cantidad_personas
+            )
+            comprobantes.append(Comprobante(id_comprobante=id_comprobante, **totales))
+            eventos.append(EventoSolicitado(
+                id_evento=id_evento,
+                precio_total=totales['total_servicio'],
+                precio_por_persona=totales['precio_x_persona'],
+            ))
+
+        with transaction.atomic():
+            Comprobante.objects.bulk_update(
+                comprobantes, ['importe_total_productos', 'total_servicio', 'precio_x_persona']
+            )
+            EventoSolicitado.objects.bulk_update(eventos, ['precio_total', 'precio_por_persona'])
+        precios_recalculados.send(sender=EventoSolicitado, ids_eventos=lote)
+
+def lineas_desactualizadas(productos=None):
+    """
+    Líneas de menú de eventos abiertos (solicitados o confirmados, con comprobante
+    vigente) cuyo precio unitario difiere del precio actual del producto
+    """
+    lineas = MenuXTipoProducto.objects.filter(
+        id_evento__estado__in=ESTADOS_REPRECIABLES,
+        id_evento__id_comprobante__fecha_vigencia__gte=timezone.now().date(),
+    ).exclude(precio_uni=F('id_producto__precio'))
+    if productos is not None:
+        lineas = lineas.filter(id_producto__in=productos)
+    return lineas
+
+def resumen_repreciado(productos=None):
+    """Informe de lo que cambiaría repreciar_menus, sin modificar nada"""
+    lineas = lineas_desactualizadas(productos)
+    diferencia = ExpressionWrapper(
+        (F('id_producto__precio') - F('precio_uni')) * F('cantidad_producto'),
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+    resumen = lineas.aggregate(
+        lineas=Count('id_menu'),
+        eventos=Count('id_evento', distinct=True),
+        diferencia=Sum(diferencia),
+    )
+    resumen['diferencia'] = resumen['diferencia'] or Decimal('0')
+    resumen['por_producto'] = list(
+        lineas.values('id_producto', 'id_producto__descripcion', 'id_producto__precio')
+        .annotate(lineas=Count('id_menu'), diferencia=Sum(diferencia))
+        .order_by('-lineas')
+    )
+    return resumen
+
+def repreciar_menus(productos=None, tamano_lote=2000):
+    """
+    Actualiza precio_uni y precio_total de las líneas desactualizadas con UPDATE por
+    lotes de claves primarias y luego recalcula una vez cada evento afectado.
+    Devuelve la cantidad de líneas y de eventos actualizados.
+    """
+    precio_actual = Subquery(
+        Producto.objects.filter(pk=OuterRef('id_producto')).values('precio')[:1]
+    )
+    total_linea = ExpressionWrapper(
+        precio_actual * F('cantidad_producto'),
+        output_field=DecimalField(max_digits=12, decimal_places=2)
+    )
+
+    lineas = lineas_desactualizadas(productos).order_by('id_menu')
+    eventos_afectados = set()
+    total_lineas = 0
+    ultimo_id = 0
+    while True:
+        lote = list(lineas.filter(id_menu__gt=ultimo_id).values_list('id_menu', 'id_evento')[:tamano_lote])
+        if not lote:
+            break
+        ids_menu = [id_menu for id_menu, _ in lote]
+        with transaction.atomic():
+            total_lineas += MenuXTipoProducto.objects.filter(id_menu__in=ids_menu).update(
+                precio_uni=precio_actual, precio_total=total_linea
+            )
+        eventos_afectados.update(id_evento for _, id_evento in lote)
+        ultimo_id = ids_menu[-1]
+
+    recalcular_eventos(sorted(eventos_afectados))
+    return {'lineas': total_lineas, 'eventos': len(eventos_afectados)}
+
+def cotizar(cantidades, cantidad_personas, precios=None):
+    """
+    Cotiza un menú hipotético con las mismas reglas que el comprobante de un evento,
+    sin escribir en la base de datos. cantidades es {id_producto: cantidad} y precios
+    una instantánea opcional {id_producto: precio}; si no se indica, se lee en una consulta.
+    """
+    if precios is None:
+        precios = dict(
+            Producto.objects.filter(pk__in=list(cantidades)).values_list('id_producto', 'precio')
+        )
+
+    items = []
+    importe_total_productos = Decimal('0')
+    for id_producto, cantidad in cantidades.items():
+        precio_total = precios[id_producto] * cantidad
+        importe_total_productos += precio_total
+        items.append({
+            'id_producto': id_producto,
+            'cantidad_producto': cantidad,
+            'precio_uni': precios[id_producto],
+            'precio_total': precio_total,
+        })
+
+    cotizacion = Comprobante.calcular_totales(importe_total_productos, cantidad_personas)
+    cotizacion['senia'] = (cotizacion['total_servicio'] * Senia.PORCENTAJE_SENIA).quantize(Decimal('0.01'))
+    cotizacion['items'] = items
+    return cotizacion
@@ -0,0 +1,79 @@
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from .models import PerfilUsuario
+
+PREFIJO_ROLES = 'roles'
+
+# Con una caché compartida (Redis, Memcached, base de datos) invalidar_rol llega a
+# todos los workers y el vencimiento solo limpia usuarios inactivos. Con LocMemCache
+# cada proceso guarda su copia y la invalidación solo alcanza al que hizo el cambio,
+# así que el rol se vuelve a leer de la base cada pocos segundos.
+TTL_ROLES_COMPARTIDA = 60 * 60 * 12
+TTL_ROLES_LOCAL = 30
+
+def ttl_roles():
+    if isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return TTL_ROLES_LOCAL
+    return TTL_ROLES_COMPARTIDA
+
+# La caché no distingue un None guardado de una clave ausente
+_SIN_PERFIL = ()
+
+class RolUsuario:
+    """
+    Tipo y estado del perfil de un usuario, sin consultar la base. is_superuser e
+    is_active se leen del usuario del request, que ya está cargado.
+    """
+
+    def __init__(self, usuario, tipo_usuario, estado):
+        self.usuario = usuario
+        self.tipo_usuario = tipo_usuario
+        self.estado = estado
+
+    def es_admin(self):
+        return self.tipo_usuario == 'ADMIN' or self.usuario.is_superuser
+
+    def es_empleado(self):
+        return self.tipo_usuario == 'EMPLEADO'
+
+    def es_responsable(self):
+        return self.tipo_usuario == 'RESPONSABLE'
+
+    def es_cliente(self):
+        return self.tipo_usuario == 'CLIENTE'
+
+    def esta_activo(self):
+        return self.estado == 'ACTIVO' and self.usuario.is_active
+
+def _clave_rol(id_usuario):
+    return f'{PREFIJO_ROLES}:{id_usuario}'
+
+def rol_de_usuario(usuario):
+    """RolUsuario de un usuario autenticado desde la caché, o None si no tiene perfil"""
+    if not usuario.is_authenticated:
+        return None
+    clave = _clave_rol(usuario.pk)
+    datos = cache.get(clave)
+    if datos is None:
+        try:
+            perfil = usuario.perfilusuario
+        except PerfilUsuario.DoesNotExist:
+            datos = _SIN_PERFIL
+        else:
+            datos = (perfil.tipo_usuario, perfil.estado)
+        cache.set(clave, datos, ttl_roles())
+    if datos == _SIN_PERFIL:
+        return None
+    return RolUsuario(usuario, *datos)
+
+def rol_usuario(request):
+    """Rol del usuario del request, el que dejó PerfilUsuarioMiddleware si pasó por él"""
+    if not hasattr(request, 'rol'):
+        request.rol = rol_de_usuario(request.user)
+    return request.rol
+
+def invalidar_rol(id_usuario):
+    """Descarta el rol guardado de un usuario cuando confirma la transacción en curso"""
+    transaction.on_commit(lambda: cache.delete(_clave_rol(id_usuario)))
@@ -0,0 +1,214 @@
+from collections import defaultdict
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import (
+    EventoSolicitado, OcupacionDiaria, MenuXTipoProducto, Cliente, Personal, PerfilUsuario, Servicio,
+    FechaResumenPendiente, ClienteNgrama, precios_recalculados
+)
+from .precios import marcar_para_recalculo
+from .estadisticas import invalidar_estadisticas
+from .paneles import registrar_cambio_paneles, alcances_de_eventos, datos_evento
+from .notificaciones import publicar_aviso
+from .roles import invalidar_rol
+from .busqueda import usa_fulltext
+
+def _esta_activo(estado):
+    return estado in EventoSolicitado.ESTADOS_ACTIVOS
+
+@receiver(pre_save, sender=EventoSolicitado)
+def guardar_estado_anterior_evento(sender, instance, raw=False, **kwargs):
+    """
+    Guarda la fecha, el estado, el cliente y el responsable persistidos antes de
+    guardar el evento
+    """
+    instance._valores_anteriores = None
+    if raw or not instance.pk:
+        return
+    instance._valores_anteriores = sender.objects.filter(
+        pk=instance.pk
+    ).values('fecha', 'estado', 'id_cliente_id', 'id_responsable_id').first()
+
+@receiver(post_save, sender=EventoSolicitado)
+def actualizar_ocupacion_evento_guardado(sender, instance, raw=False, **kwargs):
+    """
+    Actualiza la ocupación diaria cuando un evento se crea, cambia de fecha o de estado
+    """
+    if raw:
+        return
+
+    cambios = defaultdict(int)
+    anterior = getattr(instance, '_valores_anteriores', None)
+    if anterior and _esta_activo(anterior['estado']):
+        cambios[anterior['fecha']] -= 1
+
+    if _esta_activo(instance.estado) and not getattr(instance, '_cupo_reservado', False):
+        cambios[instance.fecha] += 1
+
+    for fecha, delta in cambios.items():
+        OcupacionDiaria.ajustar(fecha, delta)
+
+    instance._cupo_reservado = False
+
+@receiver(post_delete, sender=EventoSolicitado)
+def actualizar_ocupacion_evento_eliminado(sender, instance, **kwargs):
+    """
+    Libera el lugar ocupado por un evento eliminado
+    """
+    if _esta_activo(instance.estado):
+        OcupacionDiaria.ajustar(instance.fecha, -1)
+
+@receiver(post_save, sender=EventoSolicitado)
+def marcar_resumen_evento_guardado(sender, instance, raw=False, **kwargs):
+    """
+    Marca la fecha del evento (y la anterior, si cambió) para el próximo
+    recálculo del resumen diario
+    """
+    if raw:
+        return
+    fechas = [instance.fecha]
+    anterior = getattr(instance, '_valores_anteriores', None)
+    if anterior:
+        fechas.append(anterior['fecha'])
+    FechaResumenPendiente.marcar(fechas)
+
+@receiver(post_delete, sender=EventoSolicitado)
+def marcar_resumen_evento_eliminado(sender, instance, **kwargs):
+    FechaResumenPendiente.marcar([instance.fecha])
+
+@receiver(precios_recalculados)
+def marcar_resumen_precios(sender, ids_eventos, **kwargs):
+    FechaResumenPendiente.marcar(
+        EventoSolicitado.objects.filter(pk__in=ids_eventos).values_list('fecha', flat=True).distinct()
+    )
+
+@receiver(post_save, sender=MenuXTipoProducto)
+@receiver(post_delete, sender=MenuXTipoProducto)
+def recalcular_precios_evento(sender, instance, raw=False, **kwargs):
+    """
+    Encola el recálculo de precios del evento cuando cambia una línea de su menú
+    """
+    if raw:
+        return
+    marcar_para_recalculo(instance.id_evento_id)
+
+def _alcances_evento(*valores):
+    alcances = set()
+    for id_cliente, id_responsable in valores:
+        alcances.add(f'cliente:{id_cliente}')
+        if id_responsable:
+            alcances.add(f'responsable:{id_responsable}')
+    return alcances
+
+@receiver(post_save, sender=EventoSolicitado)
+def invalidar_estadisticas_evento_guardado(sender, instance, raw=False, **kwargs):
+    """
+    Invalida las estadísticas globales y las del cliente y responsable del evento,
+    incluidos los anteriores si el evento cambió de manos
+    """
+    valores = [(instance.id_cliente_id, instance.id_responsable_id)]
+    anterior = getattr(instance, '_valores_anteriores', None)
+    if anterior:
+        valores.append((anterior['id_cliente_id'], anterior['id_responsable_id']))
+    invalidar_estadisticas('eventos', _alcances_evento(*valores))
+
+@receiver(post_delete, sender=EventoSolicitado)
+def invalidar_estadisticas_evento_eliminado(sender, instance, **kwargs):
+    invalidar_estadisticas(
+        'eventos', _alcances_evento((instance.id_cliente_id, instance.id_responsable_id))
+    )
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_delete, sender=Cliente)
+def invalidar_estadisticas_clientes(sender, instance, **kwargs):
+    invalidar_estadisticas('clientes')
+
+@receiver(post_save, sender=Cliente)
+def indexar_busqueda_cliente(sender, instance, raw=False, **kwargs):
+    """Actualiza los trigramas de búsqueda del cliente donde no hay índice FULLTEXT"""
+    if raw or usa_fulltext():
+        return
+    ClienteNgrama.indexar([instance])
+
+@receiver(post_save, sender=Personal)
+@receiver(post_delete, sender=Personal)
+def invalidar_estadisticas_personal(sender, instance, **kwargs):
+    invalidar_estadisticas('personal')
+
+@receiver(post_save, sender=User)
+def invalidar_estadisticas_usuario_creado(sender, instance, created=False, **kwargs):
+    # Cada inicio de sesión guarda last_login; solo las altas cambian los totales
+    if created:
+        invalidar_estadisticas('usuarios')
+
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=PerfilUsuario)
+@receiver(post_delete, sender=PerfilUsuario)
+def invalidar_estadisticas_usuarios(sender, instance, **kwargs):
+    invalidar_estadisticas('usuarios')
+
+@receiver(post_save, sender=PerfilUsuario)
+@receiver(post_delete, sender=PerfilUsuario)
+def invalidar_rol_perfil(sender, instance, **kwargs):
+    invalidar_rol(instance.usuario_id)
+
+@receiver(post_save, sender=EventoSolicitado)
+def actualizar_paneles_evento_guardado(sender, instance, raw=False, **kwargs):
+    """
+    Cambia la versión de los paneles del responsable (actual y anterior) y del
+    personal asignado al evento, y avisa por SSE si cambió el estado
+    """
+    if raw:
+        return
+    alcances = alcances_de_eventos([instance.pk])
+    anterior = getattr(instance, '_valores_anteriores', None)
+    if anterior and anterior['id_responsable_id']:
+        alcances.add(f'responsable:{anterior["id_responsable_id"]}')
+    registrar_cambio_paneles(alcances)
+
+    if anterior and anterior['estado'] != instance.estado:
+        datos = datos_evento(instance)
+        datos['estado_anterior'] = anterior['estado']
+        publicar_aviso('estado_evento', datos, alcances | {f'cliente:{instance.id_cliente_id}'})
+    instance._valores_anteriores = None
+
+@receiver(post_delete, sender=EventoSolicitado)
+def actualizar_paneles_evento_eliminado(sender, instance, **kwargs):
+    if instance.id_responsable_id:
+        registrar_cambio_paneles([f'responsable:{instance.id_responsable_id}'])
+
+@receiver(post_save, sender=Servicio)
+@receiver(post_delete, sender=Servicio)
+def actualizar_paneles_servicio(sender, instance, raw=False, created=False, signal=None, **kwargs):
+    """
+    Una asignación de personal cambia el panel del trabajador y el del responsable,
+    y se avisa a ambos por SSE
+    """
+    if raw:
+        return
+    alcances = {f'personal:{instance.id_personal_id}'}
+    alcances |= alcances_de_eventos([instance.id_evento_id])
+    registrar_cambio_paneles(alcances)
+
+    if signal is post_delete:
+        accion = 'eliminado'
+    else:
+        accion = 'asignado' if created else 'actualizado'
+    publicar_aviso('asignacion_personal', {
+        'evento': instance.id_evento_id,
+        'personal': instance.id_personal_id,
+        'servicio': instance.pk,
+        'estado': instance.estado,
+        'accion': accion,
+    }, alcances)
+
+@receiver(post_save, sender=Personal)
+@receiver(post_delete, sender=Personal)
+def actualizar_paneles_personal(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    registrar_cambio_paneles(['personal'])
+
+@receiver(precios_recalculados)
+def actualizar_paneles_precios(sender, ids_eventos, **kwargs):
+    registrar_cambio_paneles(alcances_de_eventos(ids_eventos))
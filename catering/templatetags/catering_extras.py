@@ -1,5 +1,6 @@
 from django import template
-from ..models import PerfilUsuario
+from .. import decorators
+from ..roles import rol_de_usuario
 
 register = template.Library()
 
@@ -8,51 +9,51 @@ def get_user_profile(user):
     """
     Obtiene el perfil de usuario
     """
-    try:
-        return PerfilUsuario.objects.get(usuario=user)
-    except PerfilUsuario.DoesNotExist:
-        return None
+    return decorators.get_user_profile(user)
+
+@register.simple_tag
+def get_user_rol(user):
+    """
+    Obtiene el tipo y estado del perfil de usuario desde la caché de roles
+    """
+    return rol_de_usuario(user)
 
 @register.filter
 def is_admin(user):
     """
     Verifica si el usuario es administrador
     """
-    try:
-        perfil = PerfilUsuario.objects.get(usuario=user)
-        return perfil.es_admin()
-    except PerfilUsuario.DoesNotExist:
+    rol = rol_de_usuario(user)
+    if rol is None:
         return user.is_superuser
+    return rol.es_admin()
 
 @register.filter
 def is_responsable(user):
     """
     Verifica si el usuario es responsable
     """
-    try:
-        perfil = PerfilUsuario.objects.get(usuario=user)
-        return perfil.es_responsable()
-    except PerfilUsuario.DoesNotExist:
+    rol = rol_de_usuario(user)
+    if rol is None:
         return False
+    return rol.es_responsable()
 
 @register.filter
 def is_empleado(user):
     """
     Verifica si el usuario es empleado
     """
-    try:
-        perfil = PerfilUsuario.objects.get(usuario=user)
-        return perfil.es_empleado()
-    except PerfilUsuario.DoesNotExist:
+    rol = rol_de_usuario(user)
+    if rol is None:
         return False
+    return rol.es_empleado()
 
 @register.filter
 def is_cliente(user):
     """
     Verifica si el usuario es cliente
     """
-    try:
-        perfil = PerfilUsuario.objects.get(usuario=user)
-        return perfil.tipo_usuario == 'CLIENTE'
-    except PerfilUsuario.DoesNotExist:
+    rol = rol_de_usuario(user)
+    if rol is None:
         return False
+    return rol.es_cliente()
@@ -1,2 +1,730 @@
-from django.test import TestCase
+import csv
+import json
+import threading
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import (
+    Cliente, Responsable, Comprobante, EventoSolicitado, OcupacionDiaria, TipoProducto, Producto,
+    MenuXTipoProducto, Personal, PerfilUsuario, Servicio
+)
+from .busqueda import buscar_clientes
+from .estadisticas import (
+    clave_estadisticas, contadores_cache, obtener_estadisticas_clientes, obtener_estadisticas_eventos,
+    obtener_estadisticas_personal, reiniciar_contadores_cache
+)
+from .fichas import id_ficha, ficha_de_usuario
+from .paginacion import PaginaCursor, paginar_por_cursor
+from .paneles import datos_evento, respuesta_panel
+
+class ReservaCupoConcurrenteTest(TransactionTestCase):
+    """Las reservas simultáneas de una misma fecha no deben superar el cupo diario"""
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('SQLite en memoria no admite escrituras concurrentes desde varios hilos')
+        self.cliente = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', tipo_doc='DNI', num_doc='30111222',
+            email='ana@example.com', domicilio='Calle 1'
+        )
+        self.responsable = Responsable.objects.create(
+            nombre_apellido='Juan Gómez', telefono='351000000', email='juan@example.com'
+        )
+        self.fecha = timezone.now().date() + timedelta(days=30)
+
+    def reservar(self, resultados):
+        evento = EventoSolicitado(
+            id_cliente=self.cliente, id_responsable=self.responsable, tipo_evento='OTRO',
+            fecha=self.fecha, hora=time(20, 0), ubicacion='Salón', cantidad_personas=50
+        )
+        try:
+            evento.preparar_cupo()
+            with transaction.atomic():
+                admitido = evento.reservar_cupo()
+                if admitido:
+                    evento.id_comprobante = Comprobante.objects.create(
+                        id_cliente=self.cliente, importe_total_productos=0, total_servicio=0,
+                        precio_x_persona=0, fecha_vigencia=self.fecha
+                    )
+                    evento.save()
+            resultados.append(admitido)
+        finally:
+            connection.close()
+
+    def test_reservas_paralelas_admiten_exactamente_el_cupo(self):
+        intentos = EventoSolicitado.MAX_EVENTOS_POR_DIA * 3
+        resultados = []
+        barrera = threading.Barrier(intentos)
+
+        def reservar_en_paralelo():
+            barrera.wait()
+            self.reservar(resultados)
+
+        hilos = [threading.Thread(target=reservar_en_paralelo) for _ in range(intentos)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(resultados), intentos)
+        self.assertEqual(resultados.count(True), EventoSolicitado.MAX_EVENTOS_POR_DIA)
+        self.assertEqual(
+            EventoSolicitado.objects.filter(fecha=self.fecha).count(),
+            EventoSolicitado.MAX_EVENTOS_POR_DIA
+        )
+        self.assertEqual(
+            OcupacionDiaria.eventos_en_fecha(self.fecha),
+            EventoSolicitado.MAX_EVENTOS_POR_DIA
+        )
+
+
+class ReservaCupoTest(TestCase):
+    """La fila del día se crea fuera de la reserva; el UPDATE condicional respeta el cupo"""
+
+    def test_reserva_hasta_completar_el_cupo(self):
+        fecha = timezone.now().date() + timedelta(days=30)
+        maximo = EventoSolicitado.MAX_EVENTOS_POR_DIA
+        OcupacionDiaria.crear_fecha(fecha)
+        OcupacionDiaria.crear_fecha(fecha)
+
+        resultados = []
+        for _ in range(maximo + 2):
+            with transaction.atomic():
+                resultados.append(OcupacionDiaria.reservar_lugar(fecha, maximo))
+
+        self.assertEqual(resultados, [True] * maximo + [False] * 2)
+        self.assertEqual(OcupacionDiaria.eventos_en_fecha(fecha), maximo)
+
+
+class RecalculoPreciosTest(TestCase):
+    """Los cambios de menú recalculan el comprobante del evento al confirmar la transacción"""
+
+    def setUp(self):
+        hoy = timezone.now().date()
+        cliente = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', tipo_doc='DNI', num_doc='30111222',
+            email='ana@example.com', domicilio='Calle 1'
+        )
+        responsable = Responsable.objects.create(
+            nombre_apellido='Juan Gómez', telefono='351000000', email='juan@example.com'
+        )
+        comprobante = Comprobante.objects.create(
+            id_cliente=cliente, importe_total_productos=0, total_servicio=0,
+            precio_x_persona=0, fecha_vigencia=hoy
+        )
+        self.evento = EventoSolicitado.objects.create(
+            id_cliente=cliente, id_responsable=responsable, id_comprobante=comprobante, tipo_evento='OTRO',
+            fecha=hoy + timedelta(days=30), hora=time(20, 0), ubicacion='Salón', cantidad_personas=10
+        )
+        self.tipo = TipoProducto.objects.create(descripcion='Entrada')
+        self.producto = Producto.objects.create(id_tipo_producto=self.tipo, descripcion='Plato', precio=100)
+
+    def agregar_linea(self, cantidad):
+        return MenuXTipoProducto.objects.create(
+            id_evento=self.evento, id_tipo_producto=self.tipo, id_producto=self.producto,
+            cantidad_producto=cantidad, precio_uni=100, precio_total=100 * cantidad
+        )
+
+    def test_recalcula_despues_de_un_bloque_revertido(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.agregar_linea(5)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.agregar_linea(3)
+
+        self.evento.refresh_from_db()
+        totales = Comprobante.calcular_totales(300, self.evento.cantidad_personas)
+        self.assertEqual(self.evento.precio_total, totales['total_servicio'])
+        self.assertEqual(self.evento.id_comprobante.importe_total_productos, 300)
+
+
+class IndicesConsultasTest(TestCase):
+    """Las consultas principales de las vistas deben resolverse con los índices compuestos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        hoy = timezone.now().date()
+        cls.clientes = [
+            Cliente.objects.create(
+                nombre=f'Cliente {i}', apellido=f'Apellido {i}', tipo_doc='DNI', num_doc=f'40{i:06d}',
+                email=f'cliente{i}@example.com', domicilio='Calle 1'
+            )
+            for i in range(20)
+        ]
+        cls.responsables = [
+            Responsable.objects.create(nombre_apellido=f'Responsable {i}', telefono='351000000', email=f'r{i}@example.com')
+            for i in range(5)
+        ]
+        cls.personal = [
+            Personal.objects.create(
+                tipo_personal='MOZO', nombre_y_apellido=f'Mozo {i}', telefono='351000000',
+                email=f'm{i}@example.com', estado='ACTIVO'
+            )
+            for i in range(10)
+        ]
+        comprobante = Comprobante.objects.create(
+            id_cliente=cls.clientes[0], importe_total_productos=0, total_servicio=0,
+            precio_x_persona=0, fecha_vigencia=hoy
+        )
+        estados = [estado for estado, _ in EventoSolicitado.ESTADO_CHOICES]
+        EventoSolicitado.objects.bulk_create([
+            EventoSolicitado(
+                id_cliente=cls.clientes[i % 20], id_responsable=cls.responsables[i % 5], id_comprobante=comprobante,
+                tipo_evento='OTRO', fecha=hoy + timedelta(days=i % 200), hora=time(20, 0), ubicacion='Salón',
+                cantidad_personas=50, estado=estados[i % len(estados)]
+            )
+            for i in range(600)
+        ])
+        cls.ids_eventos = list(EventoSolicitado.objects.values_list('pk', flat=True))
+
+        tipo = TipoProducto.objects.create(descripcion='Entrada')
+        productos = [Producto.objects.create(id_tipo_producto=tipo, descripcion=f'Plato {i}', precio=100) for i in range(3)]
+        MenuXTipoProducto.objects.bulk_create([
+            MenuXTipoProducto(
+                id_evento_id=id_evento, id_tipo_producto=tipo, id_producto=producto,
+                cantidad_producto=10, precio_uni=100, precio_total=1000
+            )
+            for id_evento in cls.ids_eventos
+            for producto in productos
+        ])
+        Servicio.objects.bulk_create([
+            Servicio(id_evento_id=id_evento, id_personal=cls.personal[i % 10], estado='ASIGNADO')
+            for i, id_evento in enumerate(cls.ids_eventos)
+        ])
+
+    def assertUsaIndice(self, queryset, indice):
+        plan = queryset.explain()
+        self.assertIn(indice, plan, f'La consulta no usa {indice}:\n{plan}')
+
+    def test_disponibilidad_por_fecha_y_estado(self):
+        self.assertUsaIndice(
+            EventoSolicitado.objects.filter(
+                fecha=timezone.now().date(), estado__in=EventoSolicitado.ESTADOS_ACTIVOS
+            ).order_by(),
+            'evento_fecha_estado_idx'
+        )
+
+    def test_eventos_de_un_cliente(self):
+        self.assertUsaIndice(
+            EventoSolicitado.objects.filter(id_cliente=self.clientes[3]).order_by('-fecha'),
+            'evento_cliente_fecha_idx'
+        )
+
+    def test_eventos_de_un_responsable(self):
+        self.assertUsaIndice(
+            EventoSolicitado.objects.filter(id_responsable=self.responsables[2]).order_by('-fecha'),
+            'evento_responsable_fecha_idx'
+        )
+
+    def test_servicios_de_un_trabajador(self):
+        self.assertUsaIndice(
+            Servicio.objects.filter(id_personal=self.personal[4]).order_by('-fecha_asignacion'),
+            'servicio_personal_fecha_idx'
+        )
+
+    def test_total_del_menu_por_evento(self):
+        self.assertUsaIndice(
+            MenuXTipoProducto.objects.filter(id_evento_id__in=self.ids_eventos[:50])
+            .values('id_evento').annotate(total=Sum('precio_total')).order_by(),
+            'menu_evento_total_idx'
+        )
+
+
+class FichaSesionTest(TestCase):
+    """El id de ficha guardado en la sesión se vuelve a comprobar contra el usuario"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('resp', password='clave')
+        self.otro = User.objects.create_user('otro', password='clave')
+        self.responsable = Responsable.objects.create(
+            nombre_apellido='Juan Gómez', telefono='351000000', email='juan@example.com', usuario=self.usuario
+        )
+
+    def request(self):
+        request = RequestFactory().get('/')
+        request.user = self.usuario
+        request.session = self.session
+        return request
+
+    def test_desvincular_la_ficha_invalida_el_id_de_la_sesion(self):
+        self.session = SessionStore()
+        self.assertEqual(id_ficha(self.request(), 'responsable'), self.responsable.pk)
+
+        self.responsable.usuario = self.otro
+        self.responsable.save()
+
+        self.assertIsNone(id_ficha(self.request(), 'responsable'))
+        self.assertIsNone(ficha_de_usuario(self.request(), 'responsable'))
+        self.assertNotIn('ficha_responsable', self.session)
+
+
+class BusquedaClientesTest(TestCase):
+    """La búsqueda encuentra clientes por trigramas, por prefijo corto y por documento exacto"""
+
+    def setUp(self):
+        self.perez = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', tipo_doc='DNI', num_doc='30111222',
+            email='ana@example.com', domicilio='Calle 1'
+        )
+        self.gonzalez = Cliente.objects.create(
+            nombre='Luis', apellido='González', tipo_doc='DNI', num_doc='28999888',
+            email='luis@example.com', domicilio='Calle 2'
+        )
+
+    def test_palabras_largas_usan_trigramas(self):
+        self.assertEqual(list(buscar_clientes('gonzales')), [self.gonzalez])
+
+    def test_palabras_cortas_buscan_por_prefijo(self):
+        self.assertEqual(list(buscar_clientes('Pé')), [self.perez])
+        self.assertEqual(list(buscar_clientes('lu')), [self.gonzalez])
+        self.assertEqual(list(buscar_clientes('a p')), [self.perez])
+
+    def test_documento_exacto(self):
+        self.assertEqual(list(buscar_clientes(' 28999888 ')), [self.gonzalez])
+
+
+class CacheEstadisticasTest(TestCase):
+    """Las estadísticas se sirven desde la caché y los cambios las invalidan al confirmar"""
+
+    def setUp(self):
+        cache.clear()
+        self.cliente = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', tipo_doc='DNI', num_doc='30111222',
+            email='ana@example.com', domicilio='Calle 1'
+        )
+        self.responsable = Responsable.objects.create(
+            nombre_apellido='Juan Gómez', telefono='351000000', email='juan@example.com'
+        )
+
+    def assertInvalidaAlConfirmar(self, claves, guardar):
+        with self.captureOnCommitCallbacks(execute=True):
+            guardar()
+            for clave in claves:
+                self.assertIsNotNone(cache.get(clave), clave)
+        for clave in claves:
+            self.assertIsNone(cache.get(clave), clave)
+
+    def test_guardar_cliente_invalida_al_confirmar(self):
+        obtener_estadisticas_clientes()
+        self.assertInvalidaAlConfirmar([clave_estadisticas('clientes')], self.cliente.save)
+
+    def test_guardar_personal_invalida_al_confirmar(self):
+        obtener_estadisticas_personal()
+        self.assertInvalidaAlConfirmar(
+            [clave_estadisticas('personal')],
+            lambda: Personal.objects.create(
+                tipo_personal='MOZO', nombre_y_apellido='Luis Díaz', telefono='351111111', email='luis@example.com'
+            )
+        )
+
+    def test_guardar_evento_invalida_global_cliente_y_responsable_al_confirmar(self):
+        obtener_estadisticas_eventos()
+        obtener_estadisticas_eventos(id_cliente=self.cliente.pk)
+        obtener_estadisticas_eventos(id_responsable=self.responsable.pk)
+        claves = [
+            clave_estadisticas('eventos'),
+            clave_estadisticas('eventos', f'cliente:{self.cliente.pk}'),
+            clave_estadisticas('eventos', f'responsable:{self.responsable.pk}'),
+        ]
+
+        def guardar():
+            comprobante = Comprobante.objects.create(
+                id_cliente=self.cliente, importe_total_productos=0, total_servicio=0,
+                precio_x_persona=0, fecha_vigencia=timezone.now().date()
+            )
+            EventoSolicitado.objects.create(
+                id_cliente=self.cliente, id_responsable=self.responsable, id_comprobante=comprobante,
+                tipo_evento='OTRO', fecha=timezone.now().date() + timedelta(days=30), hora=time(20, 0),
+                ubicacion='Salón', cantidad_personas=10
+            )
+
+        self.assertInvalidaAlConfirmar(claves, guardar)
+        self.assertEqual(obtener_estadisticas_eventos(id_cliente=self.cliente.pk)['total'], 1)
+
+    def test_contadores_de_aciertos_y_fallos(self):
+        reiniciar_contadores_cache()
+        obtener_estadisticas_clientes()
+        obtener_estadisticas_clientes()
+        obtener_estadisticas_clientes()
+
+        self.assertEqual(
+            contadores_cache()['clientes'], {'aciertos': 2, 'fallos': 1, 'tasa_aciertos': 66.7}
+        )
+        self.assertEqual(contadores_cache()['personal'], {'aciertos': 0, 'fallos': 0, 'tasa_aciertos': 0})
+
+
+class PaginacionCursorTest(TestCase):
+    """La paginación por cursor recorre todas las filas una sola vez en ambos sentidos"""
+
+    def setUp(self):
+        self.cliente = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', tipo_doc='DNI', num_doc='30111222',
+            email='ana@example.com', domicilio='Calle 1'
+        )
+        self.responsable = Responsable.objects.create(
+            nombre_apellido='Juan Gómez', telefono='351000000', email='juan@example.com'
+        )
+        self.hoy = timezone.now().date()
+        # Varios eventos por fecha, para que el cursor tenga que desempatar por id
+        for dias, estado in [(10, 'SOLICITADO'), (10, 'SOLICITADO'), (10, 'CONFIRMADO'), (20, 'SOLICITADO'),
+                             (20, 'SOLICITADO'), (20, 'SOLICITADO'), (30, 'SOLICITADO'), (40, 'SOLICITADO')]:
+            self.crear_evento(self.hoy + timedelta(days=dias), estado)
+
+    def crear_evento(self, fecha, estado):
+        comprobante = Comprobante.objects.create(
+            id_cliente=self.cliente, importe_total_productos=0, total_servicio=0,
+            precio_x_persona=0, fecha_vigencia=fecha
+        )
+        return EventoSolicitado.objects.create(
+            id_cliente=self.cliente, id_responsable=self.responsable, id_comprobante=comprobante,
+            tipo_evento='OTRO', fecha=fecha, hora=time(20, 0), ubicacion='Salón', cantidad_personas=10, estado=estado
+        )
+
+    def pagina_eventos(self, query):
+        request = RequestFactory().get(f'/eventos/?{query}')
+        eventos = EventoSolicitado.objects.filter(
+            estado=request.GET['estado'], fecha__gte=request.GET['fecha_desde']
+        )
+        return paginar_por_cursor(request, eventos, ['-fecha', '-id_evento'], 2)
+
+    def recorrer(self, pagina, siguiente):
+        paginas = [pagina]
+        while siguiente(paginas[-1]):
+            paginas.append(self.pagina_eventos(siguiente(paginas[-1])))
+        return paginas
+
+    def test_recorre_eventos_con_fechas_repetidas_hacia_adelante_y_atras(self):
+        filtros = f'estado=SOLICITADO&fecha_desde={self.hoy + timedelta(days=15)}'
+        esperados = list(EventoSolicitado.objects.filter(
+            estado='SOLICITADO', fecha__gte=self.hoy + timedelta(days=15)
+        ).order_by('-fecha', '-id_evento').values_list('pk', flat=True))
+
+        adelante = self.recorrer(self.pagina_eventos(filtros), PaginaCursor.query_siguiente)
+        self.assertEqual([evento.pk for pagina in adelante for evento in pagina], esperados)
+        self.assertFalse(adelante[0].has_previous)
+        for pagina in adelante[1:]:
+            self.assertIn('estado=SOLICITADO', pagina.query_anterior())
+            self.assertIn('fecha_desde=', pagina.query_anterior())
+
+        atras = self.recorrer(adelante[-1], PaginaCursor.query_anterior)
+        self.assertEqual([evento.pk for pagina in reversed(atras) for evento in pagina], esperados)
+        self.assertFalse(atras[-1].has_previous)
+
+    def test_recorre_clientes_con_apellidos_repetidos(self):
+        for numero, nombre in enumerate(['Ana', 'Ana', 'Bruno', 'Ana', 'Carla']):
+            Cliente.objects.create(
+                nombre=nombre, apellido='Pérez', tipo_doc='DNI', num_doc=f'2000000{numero}',
+                email=f'cliente{numero}@example.com', domicilio='Calle 1'
+            )
+        orden = ['apellido', 'nombre', 'id_cliente']
+        esperados = list(Cliente.objects.order_by(*orden).values_list('pk', flat=True))
+
+        vistos = []
+        query = ''
+        while True:
+            pagina = paginar_por_cursor(RequestFactory().get(f'/clientes/?{query}'), Cliente.objects.all(), orden, 2)
+            vistos.extend(cliente.pk for cliente in pagina)
+            query = pagina.query_siguiente()
+            if not query:
+                break
+        self.assertEqual(vistos, esperados)
+
+    def test_contar_acota_el_total(self):
+        filtros = f'estado=SOLICITADO&fecha_desde={self.hoy}&contar=1'
+        pagina = self.pagina_eventos(filtros)
+        self.assertEqual((pagina.total, pagina.total_aproximado), (7, False))
+
+        with mock.patch('catering.paginacion.LIMITE_CONTEO', 5):
+            pagina = self.pagina_eventos(filtros)
+        self.assertEqual((pagina.total, pagina.total_aproximado), (5, True))
+        self.assertIsNone(self.pagina_eventos(f'estado=SOLICITADO&fecha_desde={self.hoy}').total)
+
+
+class PanelEtagTest(TestCase):
+    """Los paneles responden 304 sin consultar la base mientras no cambien sus datos"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user('mozo', password='clave')
+        PerfilUsuario.objects.create(usuario=self.usuario, tipo_usuario='EMPLEADO')
+        self.personal = Personal.objects.create(
+            tipo_personal='MOZO', nombre_y_apellido='Luis Díaz', telefono='351111111',
+            email='luis@example.com', usuario=self.usuario
+        )
+        cliente = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', tipo_doc='DNI', num_doc='30111222',
+            email='ana@example.com', domicilio='Calle 1'
+        )
+        responsable = Responsable.objects.create(
+            nombre_apellido='Juan Gómez', telefono='351000000', email='juan@example.com'
+        )
+        fecha = timezone.now().date() + timedelta(days=30)
+        comprobante = Comprobante.objects.create(
+            id_cliente=cliente, importe_total_productos=0, total_servicio=0,
+            precio_x_persona=0, fecha_vigencia=fecha
+        )
+        self.evento = EventoSolicitado.objects.create(
+            id_cliente=cliente, id_responsable=responsable, id_comprobante=comprobante, tipo_evento='OTRO',
+            fecha=fecha, hora=time(20, 0), ubicacion='Salón', cantidad_personas=10
+        )
+        self.servicio = Servicio.objects.create(id_evento=self.evento, id_personal=self.personal)
+        self.client.force_login(self.usuario)
+
+    def etag_panel(self):
+        response = self.client.get('/trabajador/api/panel/')
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_version_vigente_responde_304_sin_consultas(self):
+        construidos = []
+
+        def construir():
+            construidos.append(True)
+            return {'eventos': [datos_evento(self.evento)]}
+
+        request = RequestFactory().get('/trabajador/api/panel/')
+        etag = respuesta_panel(request, [f'personal:{self.personal.pk}'], construir)['ETag']
+
+        request = RequestFactory().get('/trabajador/api/panel/', HTTP_IF_NONE_MATCH=etag)
+        with self.assertNumQueries(0):
+            response = respuesta_panel(request, [f'personal:{self.personal.pk}'], construir)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(construidos), 1)
+
+    def test_la_vista_responde_304_con_el_etag_vigente(self):
+        etag = self.etag_panel()
+        response = self.client.get('/trabajador/api/panel/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_guardar_evento_o_servicio_cambia_el_etag(self):
+        etag = self.etag_panel()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.evento.ubicacion = 'Quincho'
+            self.evento.save()
+        etag_evento = self.etag_panel()
+        self.assertNotEqual(etag_evento, etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.servicio.estado = 'EN_SERVICIO'
+            self.servicio.save()
+        self.assertNotEqual(self.etag_panel(), etag_evento)
+
+
+class MenuLoteTest(TestCase):
+    """El menú por lote crea y actualiza líneas y recalcula los precios una sola vez"""
+
+    def setUp(self):
+        hoy = timezone.now().date()
+        cliente = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', tipo_doc='DNI', num_doc='30111222',
+            email='ana@example.com', domicilio='Calle 1'
+        )
+        responsable = Responsable.objects.create(
+            nombre_apellido='Juan Gómez', telefono='351000000', email='juan@example.com'
+        )
+        comprobante = Comprobante.objects.create(
+            id_cliente=cliente, importe_total_productos=0, total_servicio=0,
+            precio_x_persona=0, fecha_vigencia=hoy
+        )
+        self.evento = EventoSolicitado.objects.create(
+            id_cliente=cliente, id_responsable=responsable, id_comprobante=comprobante, tipo_evento='OTRO',
+            fecha=hoy + timedelta(days=30), hora=time(20, 0), ubicacion='Salón', cantidad_personas=10
+        )
+        tipo = TipoProducto.objects.create(descripcion='Entrada')
+        self.empanada = Producto.objects.create(id_tipo_producto=tipo, descripcion='Empanada', precio=100)
+        self.tarta = Producto.objects.create(id_tipo_producto=tipo, descripcion='Tarta', precio=250)
+        MenuXTipoProducto.objects.create(
+            id_evento=self.evento, id_tipo_producto=tipo, id_producto=self.empanada,
+            cantidad_producto=5, precio_uni=90, precio_total=450
+        )
+
+    def lineas(self):
+        return {
+            item.id_producto_id: (item.cantidad_producto, item.precio_uni, item.precio_total)
+            for item in MenuXTipoProducto.objects.filter(id_evento=self.evento)
+        }
+
+    def test_crea_las_nuevas_y_reemplaza_la_cantidad_de_las_existentes(self):
+        calcular_precios = EventoSolicitado.calcular_precios
+        with mock.patch.object(EventoSolicitado, 'calcular_precios', autospec=True, side_effect=calcular_precios) as calculo:
+            resultado = MenuXTipoProducto.guardar_lote(self.evento, {self.empanada.pk: 2, self.tarta.pk: 3})
+
+        self.assertEqual(resultado, (1, 1))
+        self.assertEqual(calculo.call_count, 1)
+        # La línea existente conserva su precio unitario y toma la cantidad nueva, sin sumarla
+        self.assertEqual(self.lineas(), {
+            self.empanada.pk: (2, 90, 180),
+            self.tarta.pk: (3, 250, 750),
+        })
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.id_comprobante.importe_total_productos, 930)
+
+    def test_vista_agrupa_los_items_y_responde_los_totales(self):
+        self.client.force_login(User.objects.create_user('admin', password='clave'))
+        items = [
+            {'id_producto': self.tarta.pk, 'cantidad_producto': 1},
+            {'id_producto': self.tarta.pk, 'cantidad_producto': 2},
+            {'id_producto': self.empanada.pk, 'cantidad_producto': 4},
+        ]
+        response = self.client.post(
+            f'/eventos/{self.evento.pk}/editar-menu/lote/', {'items': json.dumps(items)}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['creados'], response.json()['actualizados']), (1, 1))
+        self.assertEqual(self.lineas(), {
+            self.empanada.pk: (4, 90, 360),
+            self.tarta.pk: (3, 250, 750),
+        })
+
+
+class ActualizarPreciosMenuTest(TestCase):
+    """actualizar_precios_menu lleva los menús abiertos al precio vigente de cada producto"""
+
+    def setUp(self):
+        hoy = timezone.now().date()
+        cliente = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', tipo_doc='DNI', num_doc='30111222',
+            email='ana@example.com', domicilio='Calle 1'
+        )
+        responsable = Responsable.objects.create(
+            nombre_apellido='Juan Gómez', telefono='351000000', email='juan@example.com'
+        )
+        tipo = TipoProducto.objects.create(descripcion='Entrada')
+        self.producto = Producto.objects.create(id_tipo_producto=tipo, descripcion='Plato', precio=100)
+
+        self.lineas = {}
+        for estado in ['SOLICITADO', 'FINALIZADO']:
+            comprobante = Comprobante.objects.create(
+                id_cliente=cliente, importe_total_productos=0, total_servicio=0,
+                precio_x_persona=0, fecha_vigencia=hoy + timedelta(days=30)
+            )
+            evento = EventoSolicitado.objects.create(
+                id_cliente=cliente, id_responsable=responsable, id_comprobante=comprobante, tipo_evento='OTRO',
+                fecha=hoy + timedelta(days=30), hora=time(20, 0), ubicacion='Salón', cantidad_personas=10,
+                estado=estado
+            )
+            self.lineas[estado] = MenuXTipoProducto.objects.create(
+                id_evento=evento, id_tipo_producto=tipo, id_producto=self.producto,
+                cantidad_producto=3, precio_uni=100, precio_total=300
+            )
+            evento.calcular_precios()
+
+        self.producto.precio = 150
+        self.producto.save()
+
+    def estado_actual(self):
+        linea = MenuXTipoProducto.objects.select_related('id_evento__id_comprobante').get(
+            pk=self.lineas['SOLICITADO'].pk
+        )
+        return (
+            linea.precio_uni, linea.precio_total,
+            linea.id_evento.precio_total, linea.id_evento.id_comprobante.importe_total_productos,
+        )
+
+    def test_dry_run_informa_sin_modificar(self):
+        antes = self.estado_actual()
+        salida = StringIO()
+        call_command('actualizar_precios_menu', '--dry-run', stdout=salida)
+
+        self.assertEqual(self.estado_actual(), antes)
+        self.assertIn('Líneas de menú a actualizar: 1', salida.getvalue())
+        self.assertIn('Diferencia total en productos: $150.00', salida.getvalue())
+
+    def test_actualiza_lineas_evento_y_comprobante(self):
+        call_command('actualizar_precios_menu', stdout=StringIO())
+
+        totales = Comprobante.calcular_totales(450, 10)
+        self.assertEqual(self.estado_actual(), (150, 450, totales['total_servicio'], 450))
+        # Los eventos cerrados conservan el precio con el que se facturaron
+        finalizado = MenuXTipoProducto.objects.get(pk=self.lineas['FINALIZADO'].pk)
+        self.assertEqual((finalizado.precio_uni, finalizado.precio_total), (100, 300))
+
+
+class ConsultaCumpleanosTest(TestCase):
+    """El reporte de cumpleaños filtra por mes y vocal, agrupa edades y no consulta por fila"""
+
+    def setUp(self):
+        self.hoy = timezone.now().date()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave'))
+        self.responsable = Responsable.objects.create(
+            nombre_apellido='Juan Gómez', telefono='351000000', email='juan@example.com'
+        )
+        self.mario = self.crear_cliente('Mario', 'Pérez', edad=36, dia=10, totales=[1000, 500])
+        self.beatriz = self.crear_cliente('Beatriz', 'Sosa', edad=25, dia=5)
+        # Sin vocal como segunda letra, y de otro mes
+        self.crear_cliente('Ana', 'Ruiz', edad=60, dia=20)
+        self.crear_cliente('Pedro', 'Luna', edad=40, dia=1, mes=4)
+
+    def crear_cliente(self, nombre, apellido, edad, dia, mes=3, totales=()):
+        cliente = Cliente.objects.create(
+            nombre=nombre, apellido=apellido, tipo_doc='DNI', num_doc=f'{Cliente.objects.count() + 1:08d}',
+            email=f'{nombre.lower()}@example.com', domicilio='Calle 1',
+            fecha_nacimiento=date(self.hoy.year - edad, mes, dia),
+        )
+        for numero, total in enumerate(totales):
+            comprobante = Comprobante.objects.create(
+                id_cliente=cliente, importe_total_productos=0, total_servicio=total,
+                precio_x_persona=0, fecha_vigencia=self.hoy
+            )
+            EventoSolicitado.objects.create(
+                id_cliente=cliente, id_responsable=self.responsable, id_comprobante=comprobante, tipo_evento='OTRO',
+                fecha=self.hoy + timedelta(days=30 + numero), hora=time(20, 0), ubicacion='Salón', cantidad_personas=10
+            )
+        return cliente
+
+    def consultar(self, **parametros):
+        return self.client.get('/consultas/cumpleanos/', {'mes': 3, **parametros})
+
+    def test_filas_y_edades_del_mes(self):
+        response = self.consultar()
+
+        self.assertEqual([fila['cliente'] for fila in response.context['clientes']], [self.beatriz, self.mario])
+        self.assertEqual(
+            [(fila['cantidad_eventos'], fila['monto_total']) for fila in response.context['clientes']],
+            [(0, 0), (2, 1500)]
+        )
+        self.assertEqual(response.context['clientes_por_edad'], {'18-30': 1, '31-50': 1, '51-70': 0, '70+': 0})
+        self.assertEqual(response.context['total_monto'], 1500)
+
+        sin_vocal = self.consultar(incluir_vocal='false')
+        self.assertEqual(sin_vocal.context['total_clientes'], 3)
+        self.assertEqual(sin_vocal.context['clientes_por_edad']['51-70'], 1)
+
+    def test_cantidad_de_consultas_no_depende_de_las_filas(self):
+        # La primera request guarda el rol del usuario en caché
+        self.consultar()
+        with CaptureQueriesContext(connection) as consultas:
+            self.consultar()
+        for numero in range(3):
+            self.crear_cliente(f'Mirta{numero}', 'Vera', edad=45, dia=12 + numero, totales=[200])
+
+        with self.assertNumQueries(len(consultas)):
+            response = self.consultar()
+        self.assertEqual(response.context['total_clientes'], 5)
+
+    def test_exportar_csv(self):
+        response = self.consultar(exportar='csv')
+
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="cumpleanos_03.csv"')
+        filas = list(csv.reader(b''.join(response.streaming_content).decode('utf-8-sig').splitlines()))
+        self.assertEqual(filas[0][:2], ['Apellido', 'Nombre'])
+        self.assertEqual([fila[:2] for fila in filas[1:]], [['Sosa', 'Beatriz'], ['Pérez', 'Mario']])
+        self.assertEqual((filas[2][5], Decimal(filas[2][6])), ('2', 1500))
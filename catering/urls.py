@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views, views_clientes, views_trabajadores, views_admin, views_responsables
+from . import views, views_clientes, views_trabajadores, views_admin, views_responsables, views_notificaciones
 
 app_name = 'catering'
 
@@ -49,10 +49,14 @@ urlpatterns = [
     path('cliente/eventos/<int:pk>/', views.cliente_evento_detail, name='cliente_evento_detail'),
 
     path('api/verificar-disponibilidad/', views.verificar_disponibilidad, name='verificar_disponibilidad'),
+    path('api/calendario-disponibilidad/', views.calendario_disponibilidad, name='calendario_disponibilidad'),
     path('api/productos-por-tipo/', views.obtener_productos_por_tipo, name='obtener_productos_por_tipo'),
+    path('api/cotizar/', views.cotizar_menu, name='cotizar_menu'),
+    path('api/eventos/stream/', views_notificaciones.stream_eventos, name='stream_eventos'),
 
     path('reserva/', views.reserva_catering, name='reserva_catering'),
     path('eventos/<int:evento_id>/editar-menu/', views.editar_menu, name='editar_menu'),
+    path('eventos/<int:evento_id>/editar-menu/lote/', views.editar_menu_lote, name='editar_menu_lote'),
     path('menu/<int:menu_id>/eliminar/', views.eliminar_producto_menu, name='eliminar_producto_menu'),
     path('eventos/<int:pk>/eliminar/', views.evento_delete, name='evento_delete'),
 
@@ -60,8 +64,10 @@ urlpatterns = [
     path('cliente/eventos/', views_clientes.cliente_eventos, name='cliente_eventos'),
     path('cliente/eventos/<int:pk>/', views_clientes.cliente_evento_detail, name='cliente_evento_detail'),
 
+    path('trabajador/dashboard/', views_trabajadores.trabajador_dashboard, name='trabajador_dashboard'),
     path('trabajador/servicios/', views_trabajadores.trabajador_servicios, name='trabajador_servicios'),
     path('trabajador/servicios/<int:pk>/', views_trabajadores.trabajador_servicio_detail, name='trabajador_servicio_detail'),
+    path('trabajador/api/panel/', views_trabajadores.trabajador_panel, name='trabajador_panel'),
 
     path('admin/dashboard/', views_admin.admin_dashboard, name='admin_dashboard'),
     path('admin/crear-usuario/', views_admin.crear_usuario_admin, name='crear_usuario_admin'),
@@ -69,8 +75,10 @@ urlpatterns = [
     path('admin/crear-responsable/', views_admin.crear_responsable, name='crear_responsable'),
     path('admin/crear-cliente/', views_admin.crear_cliente, name='crear_cliente'),
     path('admin/gestion-usuarios/', views_admin.gestion_usuarios, name='gestion_usuarios'),
+    path('admin/api/estadisticas-cache/', views_admin.estadisticas_cache, name='estadisticas_cache'),
 
     path('responsable/dashboard/', views_responsables.responsable_dashboard, name='responsable_dashboard'),
+    path('responsable/api/panel/', views_responsables.responsable_panel, name='responsable_panel'),
     path('responsable/eventos/', views_responsables.responsable_eventos, name='responsable_eventos'),
     path('responsable/eventos/<int:pk>/', views_responsables.responsable_evento_detail, name='responsable_evento_detail'),
     path('responsable/eventos/crear/', views_responsables.responsable_crear_evento, name='responsable_crear_evento'),
@@ -82,9 +90,10 @@ urlpatterns = [
     path('responsable/servicios/<int:servicio_id>/eliminar/', views_responsables.eliminar_personal_asignado, name='eliminar_personal_asignado'),
 
     path('api/barrios-por-provincia/', views.obtener_barrios_por_provincia, name='obtener_barrios_por_provincia'),
+    path('api/autocompletar/<str:tipo>/', views.autocompletar, name='autocompletar'),
 
     path('eventos/<int:evento_id>/gestionar-sena/', views.gestionar_sena_evento, name='gestionar_sena_evento'),
 
     path('empleado/dashboard/', views.empleado_dashboard, name='empleado_dashboard'),
-    path('responsable/dashboard/', views.responsable_dashboard, name='responsable_dashboard'),
+    path('empleado/api/panel/', views.empleado_panel, name='empleado_panel'),
 ]
@@ -1,29 +1,44 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.contrib.auth import login
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Sum, Count, Max, Q
+from django.db import transaction
+from django.db.models import Sum, Count, Max, Q, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Substr
 from django.utils import timezone
 from django.http import JsonResponse
-from django.core.paginator import Paginator
+from django.utils.cache import get_conditional_response, set_response_etag
 from datetime import datetime, timedelta
 from decimal import Decimal
 from .models import (
     Cliente, Responsable, TipoProducto, Producto, Comprobante,
     EventoSolicitado, MenuXTipoProducto, Senia, Personal, Servicio, PerfilUsuario,
-    Provincia, Barrio
+    Provincia, Barrio, OcupacionDiaria
+)
+from .forms import ClienteForm, EventoForm, MenuForm, MenuLoteForm, CotizacionForm, PersonalForm, AsignarPersonalForm, CambiarEstadoEventoForm, ProductoForm, TipoProductoForm, RegistroForm, GestionarSenaForm
+from .precios import cotizar
+from .paneles import respuesta_panel, datos_evento
+from .fichas import id_ficha, personal_de_usuario
+from .roles import rol_usuario
+from .paginacion import paginar_por_cursor
+from .busqueda import autocompletar_clientes, autocompletar_responsables, buscar_clientes
+from .exportaciones import CONTENT_TYPES, TAMANO_LOTE, respuesta_exportacion
+from .estadisticas import (
+    estadisticas_servicios, obtener_estadisticas_eventos, obtener_estadisticas_clientes,
+    obtener_estadisticas_personal, eventos_por_estado_resumen, ingresos_por_mes
 )
-from .forms import ClienteForm, EventoForm, MenuForm, PersonalForm, AsignarPersonalForm, CambiarEstadoEventoForm, ProductoForm, TipoProductoForm, RegistroForm, GestionarSenaForm
 
 def index(request):
     """Vista principal del sistema"""
+    eventos = obtener_estadisticas_eventos()
     context = {
-        'total_clientes': Cliente.objects.count(),
-        'total_eventos': EventoSolicitado.objects.count(),
-        'eventos_hoy': EventoSolicitado.objects.filter(fecha=timezone.now().date()).count(),
-        'eventos_pendientes': EventoSolicitado.objects.filter(estado='SOLICITADO').count(),
-        'personal_activo': Personal.objects.filter(estado='ACTIVO').count(),
+        'total_clientes': obtener_estadisticas_clientes()['total'],
+        'total_eventos': eventos['total'],
+        'eventos_hoy': eventos['hoy'],
+        'eventos_pendientes': eventos['pendientes'],
+        'personal_activo': obtener_estadisticas_personal()['activos'],
     }
     return render(request, 'catering/index.html', context)
 
@@ -31,35 +46,25 @@ def index(request):
 def dashboard(request):
     """Dashboard principal para usuarios autenticados"""
 
-    total_eventos = EventoSolicitado.objects.count()
-    eventos_este_mes = EventoSolicitado.objects.filter(
-        fecha__month=timezone.now().month,
-        fecha__year=timezone.now().year
-    ).count()
-
-    eventos_por_estado_raw = EventoSolicitado.objects.values('estado').annotate(
-        count=Count('id_evento')
-    ).order_by('estado')
+    eventos = obtener_estadisticas_eventos()
+    total_eventos = eventos['total']
+    eventos_este_mes = eventos['este_mes']
+    eventos_por_estado = eventos_por_estado_resumen()
 
-    eventos_por_estado = []
-    for estado in eventos_por_estado_raw:
-        porcentaje = (estado['count'] / total_eventos * 100) if total_eventos > 0 else 0
-        estado['porcentaje'] = round(porcentaje, 1)
-        eventos_por_estado.append(estado)
-
-    eventos_proximos = EventoSolicitado.objects.filter(
+    eventos_proximos = EventoSolicitado.objects.select_related('id_cliente').filter(
         fecha__gte=timezone.now().date(),
         fecha__lte=timezone.now().date() + timedelta(days=7)
     ).order_by('fecha', 'hora')[:10]
 
-    personal_disponible = Personal.objects.filter(estado='ACTIVO').count()
+    personal_disponible = obtener_estadisticas_personal()['activos']
 
-    total_clientes = Cliente.objects.count()
+    total_clientes = obtener_estadisticas_clientes()['total']
     
     context = {
         'total_eventos': total_eventos,
         'eventos_este_mes': eventos_este_mes,
         'eventos_por_estado': eventos_por_estado,
+        'ingresos_por_mes': ingresos_por_mes(),
         'eventos_proximos': eventos_proximos,
         'personal_disponible': personal_disponible,
         'total_clientes': total_clientes,
@@ -69,20 +74,15 @@ def dashboard(request):
 @login_required
 def cliente_list(request):
     """Lista de clientes"""
-    clientes = Cliente.objects.all().order_by('apellido', 'nombre')
+    clientes = Cliente.objects.all()
+    orden = ['apellido', 'nombre', 'id_cliente']
 
-    search = request.GET.get('search')
+    search = (request.GET.get('search') or '').strip()
     if search:
-        clientes = clientes.filter(
-            Q(nombre__icontains=search) |
-            Q(apellido__icontains=search) |
-            Q(email__icontains=search) |
-            Q(num_doc__icontains=search)
-        )
+        clientes = buscar_clientes(search)
+        orden = ['-relevancia', 'id_cliente']
 
-    paginator = Paginator(clientes, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginar_por_cursor(request, clientes, orden, 20)
     
     context = {
         'page_obj': page_obj,
@@ -96,9 +96,10 @@ def cliente_detail(request, pk):
     cliente = get_object_or_404(Cliente, pk=pk)
     eventos = EventoSolicitado.objects.filter(id_cliente=cliente).order_by('-fecha')
 
-    total_eventos = eventos.count()
-    eventos_completados = eventos.filter(estado='FINALIZADO').count()
-    eventos_pendientes = eventos.filter(estado__in=['SOLICITADO', 'CONFIRMADO', 'EN_PROCESO']).count()
+    estadisticas = obtener_estadisticas_eventos(id_cliente=cliente.pk)
+    total_eventos = estadisticas['total']
+    eventos_completados = estadisticas['finalizados']
+    eventos_pendientes = estadisticas['activos']
 
     total_facturado = eventos.filter(estado='FINALIZADO').aggregate(
         total=Sum('id_comprobante__total_servicio')
@@ -219,7 +220,7 @@ def cliente_evento_detail(request, pk):
 @login_required
 def evento_list(request):
     """Lista de eventos"""
-    eventos = EventoSolicitado.objects.select_related('id_cliente', 'id_responsable').all().order_by('-fecha')
+    eventos = EventoSolicitado.objects.select_related('id_cliente', 'id_responsable').all()
 
     estado = request.GET.get('estado')
     tipo = request.GET.get('tipo')
@@ -235,9 +236,7 @@ def evento_list(request):
     if fecha_hasta:
         eventos = eventos.filter(fecha__lte=fecha_hasta)
 
-    paginator = Paginator(eventos, 15)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginar_por_cursor(request, eventos, ['-fecha', '-id_evento'], 15)
     
     context = {
         'page_obj': page_obj,
@@ -276,7 +275,7 @@ def evento_detail(request, pk):
 def evento_create(request):
     """Crear nuevo evento - Solo Admin y Responsables"""
 
-    user_profile = getattr(request.user, 'perfilusuario', None)
+    user_profile = rol_usuario(request)
     if not user_profile or user_profile.tipo_usuario not in ['ADMIN', 'RESPONSABLE']:
         if not request.user.is_superuser:
             messages.error(request, 'No tienes permisos para crear eventos. Solo administradores y responsables pueden crear eventos.')
@@ -288,22 +287,27 @@ def evento_create(request):
 
             evento = form.save(commit=False)
 
-            from catering.models import Comprobante
-            comprobante = Comprobante.objects.create(
-                id_cliente=evento.id_cliente,
-                fecha_pedido=timezone.now().date(),
-                importe_total_productos=0.00,
-                total_servicio=0.00,
-                precio_x_persona=0.00,
-                fecha_vigencia=evento.fecha
-            )
-
-            evento.id_comprobante = comprobante
-
-            evento.save()
+            evento.preparar_cupo()
+            with transaction.atomic():
+                cupo_disponible = evento.reservar_cupo()
+                if cupo_disponible:
+                    comprobante = Comprobante.objects.create(
+                        id_cliente=evento.id_cliente,
+                        fecha_pedido=timezone.now().date(),
+                        importe_total_productos=0.00,
+                        total_servicio=0.00,
+                        precio_x_persona=0.00,
+                        fecha_vigencia=evento.fecha
+                    )
+
+                    evento.id_comprobante = comprobante
+
+                    evento.save()
             
-            messages.success(request, f'Evento {evento} creado exitosamente.')
-            return redirect('catering:evento_detail', pk=evento.pk)
+            if cupo_disponible:
+                messages.success(request, f'Evento {evento} creado exitosamente.')
+                return redirect('catering:evento_detail', pk=evento.pk)
+            form.add_error('fecha', 'No hay disponibilidad para la fecha seleccionada.')
     else:
         form = EventoForm()
     
@@ -318,7 +322,7 @@ def evento_update(request, pk):
     """Actualizar evento - Solo Admin y Responsables"""
     evento = get_object_or_404(EventoSolicitado, pk=pk)
 
-    user_profile = getattr(request.user, 'perfilusuario', None)
+    user_profile = rol_usuario(request)
     if not user_profile or user_profile.tipo_usuario not in ['ADMIN', 'RESPONSABLE']:
         if not request.user.is_superuser:
             messages.error(request, 'No tienes permisos para editar eventos.')
@@ -345,17 +349,56 @@ def evento_update(request, pk):
     }
     return render(request, 'catering/evento_form.html', context)
 
+def _clientes_cumpleanos(mes, incluir_vocal):
+    """Clientes que cumplen años en el mes, opcionalmente con vocal como segunda letra del nombre"""
+    # mes_nacimiento/dia_nacimiento están indexados; fecha_nacimiento__month obligaría a recorrer la tabla
+    clientes = Cliente.objects.filter(mes_nacimiento=mes)
+    if incluir_vocal:
+        # Mayúsculas y minúsculas explícitas: LOWER() de SQLite no cubre las vocales acentuadas
+        clientes = clientes.annotate(
+            segunda_letra=Substr('nombre', 2, 1)
+        ).filter(segunda_letra__in=list(Cliente.VOCALES + Cliente.VOCALES.upper()))
+    return clientes
+
+def _ultimo_evento(campo):
+    return Subquery(
+        EventoSolicitado.objects.filter(
+            id_cliente=OuterRef('pk')
+        ).order_by('-fecha', '-id_evento').values(campo)[:1]
+    )
+
+def _con_totales_cumpleanos(clientes):
+    return clientes.annotate(
+        cantidad_eventos=Count('eventosolicitado'),
+        monto_total=Coalesce(Sum('eventosolicitado__id_comprobante__total_servicio'), Decimal('0')),
+    ).order_by('dia_nacimiento', 'apellido', 'nombre')
+
+def _exportar_cumpleanos(request, formato, clientes, mes):
+    """Reporte de cumpleaños en CSV o XLSX, leído por lotes y enviado a medida que se genera"""
+    encabezados = [
+        'Apellido', 'Nombre', 'Email', 'Fecha de Nacimiento', 'Edad',
+        'Cantidad de Eventos', 'Monto Total', 'Último Evento',
+    ]
+    filas = (
+        [
+            cliente.apellido, cliente.nombre, cliente.email, cliente.fecha_nacimiento,
+            cliente.get_edad(), cliente.cantidad_eventos, cliente.monto_total, cliente.ultimo_evento_fecha,
+        ]
+        for cliente in _con_totales_cumpleanos(clientes).annotate(
+            ultimo_evento_fecha=_ultimo_evento('fecha'),
+        ).iterator(chunk_size=TAMANO_LOTE)
+    )
+    return respuesta_exportacion(request, formato, encabezados, filas, f'cumpleanos_{mes:02d}')
+
 @login_required
 def consulta_cumpleanos(request):
     """Consulta de marketing - Reporte de cumpleaños para recordatorios - Solo Admin"""
 
-    user_profile = getattr(request.user, 'perfilusuario', None)
+    user_profile = rol_usuario(request)
     if not user_profile or user_profile.tipo_usuario != 'ADMIN':
         if not request.user.is_superuser:
             messages.error(request, 'No tienes permisos para acceder a consultas de marketing.')
             return redirect('catering:index')
-    
-    from decimal import Decimal
 
     mes = request.GET.get('mes', timezone.now().month)
     incluir_vocal = request.GET.get('incluir_vocal', 'true') == 'true'
@@ -367,64 +410,57 @@ def consulta_cumpleanos(request):
     except (ValueError, TypeError):
         mes = timezone.now().month
 
-    clientes_cumpleanos = Cliente.objects.filter(
-        fecha_nacimiento__month=mes
-    ).exclude(
-        fecha_nacimiento__isnull=True
-    ).order_by('fecha_nacimiento__day', 'apellido', 'nombre')
-
-    clientes_filtrados = []
-    total_monto = Decimal('0')
-    
-    for cliente in clientes_cumpleanos:
-
-        if incluir_vocal and not cliente.tiene_vocal_segunda_letra():
-            continue
+    clientes_cumpleanos = _clientes_cumpleanos(mes, incluir_vocal)
 
-        edad = cliente.get_edad() if cliente.fecha_nacimiento else None
+    formato = request.GET.get('exportar')
+    if formato in CONTENT_TYPES:
+        return _exportar_cumpleanos(request, formato, clientes_cumpleanos, mes)
 
-        eventos_cliente = EventoSolicitado.objects.filter(id_cliente=cliente)
-        monto_total = Decimal('0')
-        cantidad_eventos = eventos_cliente.count()
-        
-        for evento in eventos_cliente:
-            if hasattr(evento, 'id_comprobante') and evento.id_comprobante:
-                monto_total += evento.id_comprobante.total_servicio or Decimal('0')
+    clientes = list(
+        _con_totales_cumpleanos(clientes_cumpleanos).annotate(
+            ultimo_evento_id=_ultimo_evento('id_evento'),
+        )
+    )
+    ultimos_eventos = EventoSolicitado.objects.in_bulk(
+        [cliente.ultimo_evento_id for cliente in clientes if cliente.ultimo_evento_id]
+    )
 
-        ultimo_evento = eventos_cliente.order_by('-fecha').first()
-        
-        clientes_filtrados.append({
+    clientes_filtrados = [
+        {
             'cliente': cliente,
-            'edad': edad,
-            'monto_total': monto_total,
-            'cantidad_eventos': cantidad_eventos,
-            'ultimo_evento': ultimo_evento,
-            'tiene_vocal_segunda_letra': cliente.tiene_vocal_segunda_letra()
-        })
-        
-        total_monto += monto_total
+            'edad': cliente.get_edad(),
+            'monto_total': cliente.monto_total,
+            'cantidad_eventos': cliente.cantidad_eventos,
+            'ultimo_evento': ultimos_eventos.get(cliente.ultimo_evento_id),
+            'tiene_vocal_segunda_letra': cliente.tiene_vocal_segunda_letra(),
+        }
+        for cliente in clientes
+    ]
+    total_monto = sum((cliente.monto_total for cliente in clientes), Decimal('0'))
 
     total_clientes = len(clientes_filtrados)
     promedio_monto = total_monto / total_clientes if total_clientes > 0 else Decimal('0')
 
+    # Misma edad que Cliente.get_edad() (días / 365), expresada como rango de fechas de nacimiento
+    hoy = timezone.now().date()
+    def nacidos_con_edad(desde, hasta=None):
+        rango = Q(fecha_nacimiento__lte=hoy - timedelta(days=365 * desde))
+        if hasta is not None:
+            rango &= Q(fecha_nacimiento__gt=hoy - timedelta(days=365 * (hasta + 1)))
+        return rango
+
+    edades = clientes_cumpleanos.aggregate(
+        edad_18_30=Count('id_cliente', filter=nacidos_con_edad(18, 30)),
+        edad_31_50=Count('id_cliente', filter=nacidos_con_edad(31, 50)),
+        edad_51_70=Count('id_cliente', filter=nacidos_con_edad(51, 70)),
+        edad_70_mas=Count('id_cliente', filter=nacidos_con_edad(71)),
+    )
     clientes_por_edad = {
-        '18-30': 0,
-        '31-50': 0,
-        '51-70': 0,
-        '70+': 0
+        '18-30': edades['edad_18_30'],
+        '31-50': edades['edad_31_50'],
+        '51-70': edades['edad_51_70'],
+        '70+': edades['edad_70_mas'],
     }
-    
-    for cliente_data in clientes_filtrados:
-        edad = cliente_data['edad']
-        if edad:
-            if 18 <= edad <= 30:
-                clientes_por_edad['18-30'] += 1
-            elif 31 <= edad <= 50:
-                clientes_por_edad['31-50'] += 1
-            elif 51 <= edad <= 70:
-                clientes_por_edad['51-70'] += 1
-            else:
-                clientes_por_edad['70+'] += 1
 
     meses = {
         1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
@@ -461,10 +497,7 @@ def personal_list(request):
     if estado:
         personal = personal.filter(estado=estado)
 
-    total_personal = Personal.objects.count()
-    personal_activo = Personal.objects.filter(estado='ACTIVO').count()
-    mozos = Personal.objects.filter(tipo_personal='MOZO').count()
-    cocineros = Personal.objects.filter(tipo_personal='COCINERO').count()
+    estadisticas = obtener_estadisticas_personal()
     
     context = {
         'personal': personal,
@@ -474,12 +507,7 @@ def personal_list(request):
             'tipo': tipo,
             'estado': estado,
         },
-        'estadisticas': {
-            'total': total_personal,
-            'activos': personal_activo,
-            'mozos': mozos,
-            'cocineros': cocineros,
-        }
+        'estadisticas': estadisticas,
     }
     return render(request, 'catering/personal_list.html', context)
 
@@ -489,9 +517,10 @@ def personal_detail(request, pk):
     personal = get_object_or_404(Personal, pk=pk)
     servicios = Servicio.objects.filter(id_personal=personal).select_related('id_evento', 'id_evento__id_cliente').order_by('-fecha_asignacion')
 
-    total_servicios = servicios.count()
-    servicios_completados = servicios.filter(estado='COMPLETADO').count()
-    servicios_pendientes = servicios.filter(estado__in=['ASIGNADO', 'EN_SERVICIO']).count()
+    estadisticas = estadisticas_servicios(servicios)
+    total_servicios = estadisticas['total']
+    servicios_completados = estadisticas['completados']
+    servicios_pendientes = estadisticas['activos']
     
     context = {
         'personal': personal,
@@ -506,7 +535,7 @@ def personal_detail(request, pk):
 def personal_create(request):
     """Crear nuevo miembro del personal - Solo Admin"""
 
-    user_profile = getattr(request.user, 'perfilusuario', None)
+    user_profile = rol_usuario(request)
     if not user_profile or user_profile.tipo_usuario != 'ADMIN':
         if not request.user.is_superuser:
             messages.error(request, 'No tienes permisos para crear personal. Solo administradores pueden gestionar personal.')
@@ -664,7 +693,7 @@ def productos_list(request):
 def producto_create(request):
     """Crear un nuevo producto - Solo Admin y Responsables"""
 
-    user_profile = getattr(request.user, 'perfilusuario', None)
+    user_profile = rol_usuario(request)
     if not user_profile or user_profile.tipo_usuario not in ['ADMIN', 'RESPONSABLE']:
         if not request.user.is_superuser:
             messages.error(request, 'No tienes permisos para crear productos.')
@@ -815,22 +844,62 @@ def verificar_disponibilidad(request):
     if fecha:
         try:
             fecha_obj = datetime.strptime(fecha, '%Y-%m-%d').date()
-            eventos_count = EventoSolicitado.objects.filter(
-                fecha=fecha_obj,
-                estado__in=['SOLICITADO', 'CONFIRMADO', 'EN_PROCESO']
-            ).count()
+            eventos_count = OcupacionDiaria.eventos_en_fecha(fecha_obj)
             
-            disponible = eventos_count < 10
+            disponible = eventos_count < EventoSolicitado.MAX_EVENTOS_POR_DIA
             return JsonResponse({
                 'disponible': disponible,
                 'eventos_count': eventos_count,
-                'max_eventos': 10
+                'max_eventos': EventoSolicitado.MAX_EVENTOS_POR_DIA
             })
         except ValueError:
             return JsonResponse({'error': 'Fecha inválida'}, status=400)
     
     return JsonResponse({'error': 'Fecha requerida'}, status=400)
 
+def calendario_disponibilidad(request):
+    """Ocupación y cupos libres de cada día de un rango de fechas"""
+    desde = request.GET.get('desde')
+    hasta = request.GET.get('hasta')
+    if not desde or not hasta:
+        return JsonResponse({'error': 'Fechas desde y hasta requeridas'}, status=400)
+
+    try:
+        desde_obj = datetime.strptime(desde, '%Y-%m-%d').date()
+        hasta_obj = datetime.strptime(hasta, '%Y-%m-%d').date()
+    except ValueError:
+        return JsonResponse({'error': 'Fecha inválida'}, status=400)
+
+    if hasta_obj < desde_obj:
+        return JsonResponse({'error': 'La fecha hasta no puede ser anterior a la fecha desde'}, status=400)
+    if (hasta_obj - desde_obj).days > 92:
+        return JsonResponse({'error': 'El rango no puede superar los 92 días'}, status=400)
+
+    ocupacion = OcupacionDiaria.eventos_en_rango(desde_obj, hasta_obj)
+    max_eventos = EventoSolicitado.MAX_EVENTOS_POR_DIA
+
+    dias = []
+    fecha = desde_obj
+    while fecha <= hasta_obj:
+        eventos_count = ocupacion.get(fecha, 0)
+        dias.append({
+            'fecha': fecha.isoformat(),
+            'eventos_count': eventos_count,
+            'cupos_libres': max(max_eventos - eventos_count, 0),
+            'disponible': eventos_count < max_eventos,
+        })
+        fecha += timedelta(days=1)
+
+    response = JsonResponse({
+        'desde': desde_obj.isoformat(),
+        'hasta': hasta_obj.isoformat(),
+        'max_eventos': max_eventos,
+        'dias': dias,
+    })
+    response['Cache-Control'] = 'private, max-age=60'
+    set_response_etag(response)
+    return get_conditional_response(request, etag=response['ETag'], response=response)
+
 def obtener_productos_por_tipo(request):
     """Obtener productos por tipo para el armado de menús"""
     tipo_id = request.GET.get('tipo_id')
@@ -857,18 +926,24 @@ def reserva_catering(request):
             if not evento.id_responsable:
                 evento.id_responsable = Responsable.objects.first()
 
-            comprobante = Comprobante.objects.create(
-                id_cliente=evento.id_cliente,
-                importe_total_productos=0,
-                total_servicio=0,
-                precio_x_persona=0,
-                fecha_vigencia=timezone.now().date() + timedelta(days=10)
-            )
-            evento.id_comprobante = comprobante
-            evento.save()
+            evento.preparar_cupo()
+            with transaction.atomic():
+                cupo_disponible = evento.reservar_cupo()
+                if cupo_disponible:
+                    comprobante = Comprobante.objects.create(
+                        id_cliente=evento.id_cliente,
+                        importe_total_productos=0,
+                        total_servicio=0,
+                        precio_x_persona=0,
+                        fecha_vigencia=timezone.now().date() + timedelta(days=10)
+                    )
+                    evento.id_comprobante = comprobante
+                    evento.save()
             
-            messages.success(request, 'Reserva creada exitosamente. Ahora puedes agregar productos al menú.')
-            return redirect('catering:editar_menu', evento_id=evento.id_evento)
+            if cupo_disponible:
+                messages.success(request, 'Reserva creada exitosamente. Ahora puedes agregar productos al menú.')
+                return redirect('catering:editar_menu', evento_id=evento.id_evento)
+            form.add_error('fecha', 'No hay disponibilidad para la fecha seleccionada.')
     else:
         form = EventoForm()
     
@@ -878,6 +953,19 @@ def reserva_catering(request):
     }
     return render(request, 'catering/reserva_catering.html', context)
 
+@login_required
+@require_POST
+def cotizar_menu(request):
+    """Cotiza un menú y una cantidad de personas sin guardar nada"""
+    form = CotizacionForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'error': form.errors.get_json_data()}, status=400)
+    
+    cotizacion = cotizar(
+        form.cleaned_data['items'], form.cleaned_data['cantidad_personas'], precios=form.precios
+    )
+    return JsonResponse(cotizacion)
+
 @login_required
 def editar_menu(request, evento_id):
     """Vista para editar el menú de un evento"""
@@ -887,29 +975,29 @@ def editar_menu(request, evento_id):
         form = MenuForm(request.POST)
         if form.is_valid():
             try:
-
-                producto_existente = MenuXTipoProducto.objects.filter(
-                    id_evento=evento,
-                    id_tipo_producto=form.cleaned_data['id_tipo_producto'],
-                    id_producto=form.cleaned_data['id_producto']
-                ).first()
+                # Los cambios del menú recalculan los precios una sola vez al confirmar la transacción
+                with transaction.atomic():
+                    producto_existente = MenuXTipoProducto.objects.filter(
+                        id_evento=evento,
+                        id_tipo_producto=form.cleaned_data['id_tipo_producto'],
+                        id_producto=form.cleaned_data['id_producto']
+                    ).first()
                 
-                if producto_existente:
-
-                    producto_existente.cantidad_producto += form.cleaned_data['cantidad_producto']
-                    producto_existente.precio_total = producto_existente.precio_uni * producto_existente.cantidad_producto
-                    producto_existente.save()
-                    messages.success(request, 'Cantidad del producto actualizada exitosamente.')
-                else:
-
-                    menu_item = form.save(commit=False)
-                    menu_item.id_evento = evento
-                    menu_item.precio_uni = menu_item.id_producto.precio
-                    menu_item.precio_total = menu_item.precio_uni * menu_item.cantidad_producto
-                    menu_item.save()
-                    messages.success(request, 'Producto agregado al menú exitosamente.')
-
-                actualizar_comprobante(evento)
+                    if producto_existente:
+
+                        producto_existente.cantidad_producto += form.cleaned_data['cantidad_producto']
+                        producto_existente.precio_total = producto_existente.precio_uni * producto_existente.cantidad_producto
+                        producto_existente.save()
+                        messages.success(request, 'Cantidad del producto actualizada exitosamente.')
+                    else:
+
+                        menu_item = form.save(commit=False)
+                        menu_item.id_evento = evento
+                        menu_item.precio_uni = menu_item.id_producto.precio
+                        menu_item.precio_total = menu_item.precio_uni * menu_item.cantidad_producto
+                        menu_item.save()
+                        messages.success(request, 'Producto agregado al menú exitosamente.')
+
                 return redirect('catering:editar_menu', evento_id=evento_id)
                 
             except Exception as e:
@@ -934,15 +1022,32 @@ def editar_menu(request, evento_id):
     }
     return render(request, 'catering/editar_menu.html', context)
 
+@login_required
+@require_POST
+def editar_menu_lote(request, evento_id):
+    """Agrega o actualiza varios productos del menú y recalcula los precios una vez"""
+    evento = get_object_or_404(EventoSolicitado, id_evento=evento_id)
+    
+    form = MenuLoteForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'error': form.errors.get_json_data()}, status=400)
+    
+    creados, actualizados = MenuXTipoProducto.guardar_lote(evento, form.cleaned_data['items'])
+    
+    return JsonResponse({
+        'creados': creados,
+        'actualizados': actualizados,
+        'precio_total': evento.precio_total,
+        'precio_por_persona': evento.precio_por_persona,
+    })
+
 @login_required
 def eliminar_producto_menu(request, menu_id):
     """Eliminar un producto del menú"""
     menu_item = get_object_or_404(MenuXTipoProducto, id_menu=menu_id)
-    evento_id = menu_item.id_evento.id_evento
+    evento_id = menu_item.id_evento_id
     
     menu_item.delete()
-
-    actualizar_comprobante(menu_item.id_evento)
     
     messages.success(request, 'Producto eliminado del menú exitosamente.')
     return redirect('catering:editar_menu', evento_id=evento_id)
@@ -971,21 +1076,6 @@ def evento_delete(request, pk):
     }
     return render(request, 'catering/evento_confirm_delete.html', context)
 
-def actualizar_comprobante(evento):
-    """Función auxiliar para actualizar el comprobante de un evento"""
-    menu_items = MenuXTipoProducto.objects.filter(id_evento=evento)
-    total_productos = sum(item.precio_total for item in menu_items)
-    
-    comprobante = evento.id_comprobante
-    comprobante.importe_total_productos = total_productos
-    comprobante.total_servicio = total_productos * Decimal('1.3')
-    comprobante.precio_x_persona = comprobante.total_servicio / evento.cantidad_personas if evento.cantidad_personas > 0 else 0
-    comprobante.save()
-
-    evento.precio_total = comprobante.total_servicio
-    evento.precio_por_persona = comprobante.precio_x_persona
-    evento.save()
-
 def registro_usuario(request):
     """Vista para registro de nuevos usuarios (clientes)"""
     if request.user.is_authenticated:
@@ -1059,12 +1149,39 @@ def obtener_barrios_por_provincia(request):
     
     return JsonResponse(data, safe=False)
 
+@login_required
+def autocompletar(request, tipo):
+    """Vista AJAX del autocompletado de clientes y responsables en los formularios de eventos"""
+    texto = request.GET.get('q', '')
+    rol = rol_usuario(request)
+    if tipo == 'clientes':
+        clientes = Cliente.objects.only('id_cliente', 'nombre', 'apellido', 'tipo_doc', 'num_doc')
+        if rol and rol.es_cliente() and not request.user.is_superuser:
+            # Un cliente que reserva solo puede elegirse a sí mismo
+            clientes = clientes.filter(usuario=request.user)
+        resultados = [
+            {'id': cliente.id_cliente, 'texto': str(cliente), 'detalle': f'{cliente.tipo_doc} {cliente.num_doc}'}
+            for cliente in autocompletar_clientes(texto, clientes)
+        ]
+    elif tipo == 'responsables':
+        responsables = Responsable.objects.only('id_responsable', 'nombre_apellido')
+        resultados = [
+            {'id': responsable.id_responsable, 'texto': str(responsable), 'detalle': ''}
+            for responsable in autocompletar_responsables(texto, responsables)
+        ]
+    else:
+        return JsonResponse({'error': 'Tipo de autocompletado inválido'}, status=404)
+
+    response = JsonResponse({'resultados': resultados})
+    response['Cache-Control'] = 'private, max-age=60'
+    return response
+
 @login_required
 def gestionar_sena_evento(request, evento_id):
     """Vista para que los responsables gestionen la seña de un evento"""
     evento = get_object_or_404(EventoSolicitado, pk=evento_id)
 
-    user_profile = getattr(request.user, 'perfilusuario', None)
+    user_profile = rol_usuario(request)
     if not user_profile or (user_profile.tipo_usuario != 'RESPONSABLE' and not request.user.is_superuser):
         if user_profile and user_profile.tipo_usuario == 'RESPONSABLE':
             if evento.id_responsable.usuario != request.user:
@@ -1093,15 +1210,14 @@ def gestionar_sena_evento(request, evento_id):
 @login_required
 def empleado_dashboard(request):
     """Dashboard para empleados - muestra eventos donde deben trabajar"""
-    user_profile = getattr(request.user, 'perfilusuario', None)
+    user_profile = rol_usuario(request)
 
     if not user_profile or user_profile.tipo_usuario != 'EMPLEADO':
         messages.error(request, 'No tienes permisos para acceder a esta página.')
         return redirect('catering:index')
 
-    try:
-        personal = Personal.objects.get(usuario=request.user)
-    except Personal.DoesNotExist:
+    personal = personal_de_usuario(request)
+    if personal is None:
         messages.error(request, 'No se encontró información de personal para tu usuario.')
         return redirect('catering:index')
 
@@ -1116,34 +1232,24 @@ def empleado_dashboard(request):
     return render(request, 'catering/empleado_dashboard.html', context)
 
 @login_required
-def responsable_dashboard(request):
-    """Dashboard para responsables - muestra eventos asignados y herramientas de gestión"""
-    user_profile = getattr(request.user, 'perfilusuario', None)
+def empleado_panel(request):
+    """API con los eventos asignados al empleado para actualizar su panel sin recargar"""
+    user_profile = rol_usuario(request)
 
-    if not user_profile or user_profile.tipo_usuario != 'RESPONSABLE':
-        messages.error(request, 'No tienes permisos para acceder a esta página.')
-        return redirect('catering:index')
-
-    try:
-        responsable = Responsable.objects.get(usuario=request.user)
-    except Responsable.DoesNotExist:
-        messages.error(request, 'No se encontró información de responsable para tu usuario.')
-        return redirect('catering:index')
+    if not user_profile or user_profile.tipo_usuario != 'EMPLEADO':
+        return JsonResponse({'error': 'No tienes permisos para acceder a esta página.'}, status=403)
+
+    id_personal = id_ficha(request, 'personal')
+    if id_personal is None:
+        return JsonResponse({'error': 'No se encontró información de personal para tu usuario.'}, status=404)
+
+    def construir():
+        servicios = Servicio.objects.filter(id_personal_id=id_personal).select_related('id_evento')
+        eventos = [datos_evento(servicio.id_evento) for servicio in servicios]
+        return {
+            'estadisticas': {'eventos_asignados': len(eventos)},
+            'eventos': eventos,
+        }
 
-    eventos_asignados = EventoSolicitado.objects.filter(id_responsable=responsable)
-    eventos_confirmados = eventos_asignados.filter(estado__in=['CONFIRMADO', 'EN_PROCESO', 'FINALIZADO'])
+    return respuesta_panel(request, [f'personal:{id_personal}'], construir)
 
-    total_personal = Personal.objects.filter(estado='ACTIVO').count()
-    ingresos_totales = eventos_confirmados.aggregate(
-        total=Sum('precio_total')
-    )['total'] or 0
-    
-    context = {
-        'eventos_asignados': eventos_asignados,
-        'eventos_confirmados': eventos_confirmados,
-        'total_personal': total_personal,
-        'ingresos_totales': ingresos_totales,
-        'responsable': responsable,
-        'title': 'Dashboard Responsable'
-    }
-    return render(request, 'catering/responsable_dashboard.html', context)
@@ -4,9 +4,16 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import F
+from django.http import JsonResponse
 from .models import PerfilUsuario, Cliente, Personal, Responsable
 from .decorators import admin_required, get_user_profile
+from .paginacion import paginar_por_cursor
 from .forms import CrearUsuarioForm, CrearTrabajadorForm, CrearClienteForm, CrearResponsableForm
+from .estadisticas import (
+    obtener_estadisticas_usuarios, obtener_estadisticas_eventos, obtener_estadisticas_clientes,
+    obtener_estadisticas_personal, contadores_cache, eventos_por_estado_resumen, ingresos_por_mes
+)
 
 @admin_required
 def admin_dashboard(request):
@@ -15,22 +22,17 @@ def admin_dashboard(request):
     """
     perfil = get_user_profile(request.user)
 
-    from .models import EventoSolicitado
-    from django.utils import timezone
-    from django.db.models import Count
-    
-    total_usuarios = User.objects.count()
-    total_clientes = Cliente.objects.count()
-    total_personal = Personal.objects.count()
-    total_eventos = EventoSolicitado.objects.count()
+    usuarios = obtener_estadisticas_usuarios()
+    eventos = obtener_estadisticas_eventos()
+
+    total_usuarios = usuarios['total']
+    total_clientes = obtener_estadisticas_clientes()['total']
+    total_personal = obtener_estadisticas_personal()['total']
+    total_eventos = eventos['total']
 
-    usuarios_por_tipo = PerfilUsuario.objects.values('tipo_usuario').annotate(
-        count=Count('id')
-    ).order_by('tipo_usuario')
+    usuarios_por_tipo = usuarios['por_tipo']
 
-    eventos_por_estado = EventoSolicitado.objects.values('estado').annotate(
-        count=Count('id_evento')
-    ).order_by('estado')
+    eventos_por_estado = eventos_por_estado_resumen()
 
     usuarios_recientes = User.objects.order_by('-date_joined')[:5]
     
@@ -42,11 +44,20 @@ def admin_dashboard(request):
         'total_eventos': total_eventos,
         'usuarios_por_tipo': usuarios_por_tipo,
         'eventos_por_estado': eventos_por_estado,
+        'ingresos_por_mes': ingresos_por_mes(),
         'usuarios_recientes': usuarios_recientes,
+        'cache_estadisticas': contadores_cache(),
     }
     
     return render(request, 'catering/admin_dashboard.html', context)
 
+@admin_required
+def estadisticas_cache(request):
+    """
+    API con los aciertos y fallos de la caché de estadísticas por grupo
+    """
+    return JsonResponse({'grupos': contadores_cache()})
+
 @admin_required
 def crear_usuario_admin(request):
     """
@@ -124,7 +135,8 @@ def crear_trabajador(request):
                     nombre_y_apellido=form.cleaned_data['nombre_y_apellido'],
                     telefono=form.cleaned_data['telefono'],
                     email=form.cleaned_data['email'],
-                    estado=form.cleaned_data['estado']
+                    estado=form.cleaned_data['estado'],
+                    usuario=user
                 )
                 
                 messages.success(request, f'Trabajador {form.cleaned_data["nombre_y_apellido"]} creado exitosamente.')
@@ -245,21 +257,34 @@ def gestion_usuarios(request):
     """
     Vista para gestionar todos los usuarios del sistema
     """
-    usuarios = User.objects.all().order_by('-date_joined')
+    # El perfil viene en el mismo JOIN, en lugar de una consulta por fila
+    usuarios = User.objects.select_related('perfilusuario')
 
     tipo_usuario = request.GET.get('tipo_usuario', '')
     estado = request.GET.get('estado', '')
     
-    if tipo_usuario:
-        usuarios = usuarios.filter(perfilusuario__tipo_usuario=tipo_usuario)
-    if estado:
-        usuarios = usuarios.filter(perfilusuario__estado=estado)
+    if tipo_usuario not in dict(PerfilUsuario.TIPO_USUARIO_CHOICES):
+        tipo_usuario = ''
+    if estado not in dict(PerfilUsuario.ESTADO_CHOICES):
+        estado = ''
+
+    # Más recientes primero: el id crece con date_joined y, a diferencia de este, está indexado
+    orden = ['-id']
+    if tipo_usuario or estado:
+        usuarios = usuarios.filter(**{
+            f'perfilusuario__{campo}': valor
+            for campo, valor in (('tipo_usuario', tipo_usuario), ('estado', estado)) if valor
+        })
+        # Con filtro se ordena por la columna del perfil, así el índice del filtro ya da el orden
+        usuarios = usuarios.annotate(id_usuario_perfil=F('perfilusuario__usuario'))
+        orden = ['-id_usuario_perfil']
+    page_obj = paginar_por_cursor(request, usuarios, orden, 25)
 
     tipos_usuario = PerfilUsuario.TIPO_USUARIO_CHOICES
     estados = PerfilUsuario.ESTADO_CHOICES
     
     context = {
-        'usuarios': usuarios,
+        'page_obj': page_obj,
         'tipos_usuario': tipos_usuario,
         'estados': estados,
         'filtros': {
@@ -4,6 +4,7 @@ from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 from .models import EventoSolicitado, Cliente, PerfilUsuario
 from .decorators import cliente_required, get_user_profile
+from .estadisticas import obtener_estadisticas_eventos
 
 @cliente_required
 def cliente_dashboard(request):
@@ -20,9 +21,10 @@ def cliente_dashboard(request):
 
     eventos = EventoSolicitado.objects.filter(id_cliente=cliente).order_by('-fecha')
 
-    total_eventos = eventos.count()
-    eventos_activos = eventos.filter(estado__in=['SOLICITADO', 'CONFIRMADO', 'EN_PROCESO']).count()
-    eventos_finalizados = eventos.filter(estado='FINALIZADO').count()
+    estadisticas = obtener_estadisticas_eventos(id_cliente=cliente.pk)
+    total_eventos = estadisticas['total']
+    eventos_activos = estadisticas['activos']
+    eventos_finalizados = estadisticas['finalizados']
     gasto_total = sum(evento.precio_total for evento in eventos if evento.precio_total)
 
     eventos_confirmados = eventos.filter(
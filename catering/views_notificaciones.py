@@ -0,0 +1,43 @@
+import json
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from .notificaciones import obtener_broker, alcances_de_usuario
+
+INTERVALO_LATIDO = 15
+DURACION_MAXIMA = 60 * 10
+
+def _mensaje_sse(aviso):
+    return f"event: {aviso['tipo']}\ndata: {json.dumps(aviso['datos'])}\n\n"
+
+async def _emitir_avisos(alcances):
+    suscripcion = obtener_broker().suscribir(alcances)
+    try:
+        yield 'retry: 5000\n\n'
+        # La conexión se renueva periódicamente para que un cliente caído no deje la suscripción colgada
+        for _ in range(DURACION_MAXIMA // INTERVALO_LATIDO):
+            aviso = await suscripcion.siguiente(INTERVALO_LATIDO)
+            yield _mensaje_sse(aviso) if aviso else ': latido\n\n'
+    finally:
+        suscripcion.cerrar()
+
+async def stream_eventos(request):
+    """
+    Flujo SSE con los cambios de estado de eventos y de asignación de personal
+    que le corresponden al usuario. Requiere servir el proyecto por ASGI.
+    """
+    if not await sync_to_async(lambda: request.user.is_authenticated)():
+        return JsonResponse({'error': 'Autenticación requerida'}, status=401)
+
+    if not isinstance(request, ASGIRequest):
+        # Bajo WSGI el flujo ocuparía un hilo entero: 204 le indica a EventSource que no reintente
+        return HttpResponse(status=204)
+
+    alcances = await sync_to_async(alcances_de_usuario)(request.user)
+    if not alcances:
+        return JsonResponse({'error': 'No tienes permisos para acceder a esta página.'}, status=403)
+
+    response = StreamingHttpResponse(_emitir_avisos(alcances), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,12 +1,36 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.db import transaction
 from django.db.models import Q, Count, Sum
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import EventoSolicitado, Cliente, Responsable, PerfilUsuario, MenuXTipoProducto, Personal, Servicio
+from .models import EventoSolicitado, Cliente, PerfilUsuario, MenuXTipoProducto, Personal, Servicio, Comprobante
 from .decorators import responsable_required, get_user_profile
 from .forms import EventoForm, EventoResponsableForm, MenuForm, AsignarPersonalForm, CambiarEstadoEventoForm, TrabajadorEventoForm
+from .estadisticas import obtener_estadisticas_eventos, obtener_estadisticas_personal, ingresos_por_mes
+from .paneles import respuesta_panel, datos_evento
+from .fichas import id_ficha, responsable_de_usuario
+
+# Eventos que muestran las tarjetas del panel; la página y su API usan la misma porción
+EVENTOS_EN_PANEL = 10
+
+def _eventos_del_panel(id_responsable):
+    return EventoSolicitado.objects.filter(
+        id_responsable_id=id_responsable
+    ).order_by('-fecha', '-id_evento')[:EVENTOS_EN_PANEL]
+
+def _estadisticas_panel(id_responsable):
+    confirmados = Q(estado__in=['CONFIRMADO', 'EN_PROCESO', 'FINALIZADO'])
+    totales = EventoSolicitado.objects.filter(id_responsable_id=id_responsable).aggregate(
+        eventos_asignados=Count('id_evento'),
+        eventos_confirmados=Count('id_evento', filter=confirmados),
+        ingresos_totales=Sum('precio_total', filter=confirmados),
+    )
+    totales['ingresos_totales'] = totales['ingresos_totales'] or 0
+    totales['total_personal'] = obtener_estadisticas_personal()['activos']
+    return totales
 
 @responsable_required
 def responsable_dashboard(request):
@@ -15,18 +39,18 @@ def responsable_dashboard(request):
     """
     perfil = get_user_profile(request.user)
 
-    try:
-        responsable = Responsable.objects.get(email=request.user.email)
-    except Responsable.DoesNotExist:
+    responsable = responsable_de_usuario(request)
+    if responsable is None:
         messages.error(request, 'No se encontró información del responsable.')
         return redirect('catering:index')
 
     eventos = EventoSolicitado.objects.filter(id_responsable=responsable).order_by('-fecha')
 
-    total_eventos = eventos.count()
-    eventos_activos = eventos.filter(estado__in=['SOLICITADO', 'CONFIRMADO', 'EN_PROCESO']).count()
-    eventos_finalizados = eventos.filter(estado='FINALIZADO').count()
-    eventos_cancelados = eventos.filter(estado='CANCELADO').count()
+    estadisticas = obtener_estadisticas_eventos(id_responsable=responsable.pk)
+    total_eventos = estadisticas['total']
+    eventos_activos = estadisticas['activos']
+    eventos_finalizados = estadisticas['finalizados']
+    eventos_cancelados = estadisticas['cancelados']
 
     eventos_proximos = eventos.filter(
         fecha__gte=timezone.now().date(),
@@ -35,10 +59,6 @@ def responsable_dashboard(request):
 
     eventos_hoy = eventos.filter(fecha=timezone.now().date()).order_by('hora')
 
-    eventos_por_estado = eventos.values('estado').annotate(
-        count=Count('id_evento')
-    ).order_by('estado')
-    
     context = {
         'responsable': responsable,
         'perfil': perfil,
@@ -48,20 +68,41 @@ def responsable_dashboard(request):
         'eventos_cancelados': eventos_cancelados,
         'eventos_proximos': eventos_proximos,
         'eventos_hoy': eventos_hoy,
-        'eventos_por_estado': eventos_por_estado,
-        'eventos': eventos[:10],
+        'ingresos_por_mes': ingresos_por_mes(id_responsable=responsable.pk),
+        'estadisticas': _estadisticas_panel(responsable.pk),
+        'eventos_asignados': _eventos_del_panel(responsable.pk).select_related('id_cliente').prefetch_related(
+            'servicio_set__id_personal'
+        ),
     }
     
     return render(request, 'catering/responsable_dashboard.html', context)
 
+@responsable_required
+def responsable_panel(request):
+    """
+    API con los contadores y eventos del responsable para actualizar su panel sin recargar
+    """
+    id_responsable = id_ficha(request, 'responsable')
+    if id_responsable is None:
+        return JsonResponse({'error': 'No se encontró información del responsable.'}, status=404)
+
+    def construir():
+        estadisticas = _estadisticas_panel(id_responsable)
+        estadisticas['ingresos_totales'] = f"{estadisticas['ingresos_totales']:.0f}"
+        return {
+            'estadisticas': estadisticas,
+            'eventos': [datos_evento(evento) for evento in _eventos_del_panel(id_responsable)],
+        }
+
+    return respuesta_panel(request, [f'responsable:{id_responsable}', 'personal'], construir)
+
 @responsable_required
 def responsable_eventos(request):
     """
     Lista de eventos del responsable
     """
-    try:
-        responsable = Responsable.objects.get(email=request.user.email)
-    except Responsable.DoesNotExist:
+    responsable = responsable_de_usuario(request)
+    if responsable is None:
         messages.error(request, 'No se encontró información del responsable.')
         return redirect('catering:index')
 
@@ -106,9 +147,8 @@ def responsable_evento_detail(request, pk):
     """
     Detalle de un evento específico del responsable
     """
-    try:
-        responsable = Responsable.objects.get(email=request.user.email)
-    except Responsable.DoesNotExist:
+    responsable = responsable_de_usuario(request)
+    if responsable is None:
         messages.error(request, 'No se encontró información del responsable.')
         return redirect('catering:index')
     
@@ -132,9 +172,8 @@ def responsable_crear_evento(request):
     """
     Crear nuevo evento (solo responsables)
     """
-    try:
-        responsable = Responsable.objects.get(email=request.user.email)
-    except Responsable.DoesNotExist:
+    responsable = responsable_de_usuario(request)
+    if responsable is None:
         messages.error(request, 'No se encontró información del responsable.')
         return redirect('catering:index')
     
@@ -149,28 +188,43 @@ def responsable_crear_evento(request):
 
             evento.id_responsable = responsable
             evento.estado = 'SOLICITADO'
-            evento.save()
 
-            trabajadores_data = request.POST.getlist('trabajadores')
-            cantidades_data = request.POST.getlist('cantidades')
+            evento.preparar_cupo()
+            with transaction.atomic():
+                cupo_disponible = evento.reservar_cupo()
+                if cupo_disponible:
+                    evento.id_comprobante = Comprobante.objects.create(
+                        id_cliente=evento.id_cliente,
+                        fecha_pedido=timezone.now().date(),
+                        importe_total_productos=0,
+                        total_servicio=0,
+                        precio_x_persona=0,
+                        fecha_vigencia=evento.fecha
+                    )
+                    evento.save()
+
+            if cupo_disponible:
+                trabajadores_data = request.POST.getlist('trabajadores')
+                cantidades_data = request.POST.getlist('cantidades')
             
-            for i, trabajador_id in enumerate(trabajadores_data):
-                if trabajador_id and i < len(cantidades_data) and cantidades_data[i]:
-                    try:
-                        personal = Personal.objects.get(id_personal=trabajador_id)
-                        cantidad = int(cantidades_data[i])
+                for i, trabajador_id in enumerate(trabajadores_data):
+                    if trabajador_id and i < len(cantidades_data) and cantidades_data[i]:
+                        try:
+                            personal = Personal.objects.get(id_personal=trabajador_id)
+                            cantidad = int(cantidades_data[i])
 
-                        Servicio.objects.create(
-                            id_evento=evento,
-                            id_personal=personal,
-                            cantidad_personal=cantidad,
-                            estado='ASIGNADO'
-                        )
-                    except (Personal.DoesNotExist, ValueError):
-                        continue
+                            Servicio.objects.create(
+                                id_evento=evento,
+                                id_personal=personal,
+                                cantidad_personal=cantidad,
+                                estado='ASIGNADO'
+                            )
+                        except (Personal.DoesNotExist, ValueError):
+                            continue
             
-            messages.success(request, f'Evento {evento.tipo_evento} creado exitosamente.')
-            return redirect('catering:responsable_evento_detail', pk=evento.pk)
+                messages.success(request, f'Evento {evento.tipo_evento} creado exitosamente.')
+                return redirect('catering:responsable_evento_detail', pk=evento.pk)
+            form.add_error('fecha', 'No hay disponibilidad para la fecha seleccionada.')
     else:
         form = EventoForm()
         trabajador_form = TrabajadorEventoForm()
@@ -192,9 +246,8 @@ def responsable_editar_evento(request, pk):
     """
     Editar evento existente - solo cantidad de personal
     """
-    try:
-        responsable = Responsable.objects.get(email=request.user.email)
-    except Responsable.DoesNotExist:
+    responsable = responsable_de_usuario(request)
+    if responsable is None:
         messages.error(request, 'No se encontró información del responsable.')
         return redirect('catering:index')
     
@@ -223,9 +276,8 @@ def responsable_asignar_personal(request, evento_id):
     """
     Asignar personal a un evento
     """
-    try:
-        responsable = Responsable.objects.get(email=request.user.email)
-    except Responsable.DoesNotExist:
+    responsable = responsable_de_usuario(request)
+    if responsable is None:
         messages.error(request, 'No se encontró información del responsable.')
         return redirect('catering:index')
     
@@ -260,9 +312,8 @@ def responsable_cambiar_estado_evento(request, evento_id):
     """
     Cambiar estado de un evento
     """
-    try:
-        responsable = Responsable.objects.get(email=request.user.email)
-    except Responsable.DoesNotExist:
+    responsable = responsable_de_usuario(request)
+    if responsable is None:
         messages.error(request, 'No se encontró información del responsable.')
         return redirect('catering:index')
     
@@ -291,9 +342,8 @@ def eliminar_personal_asignado(request, servicio_id):
     """
     Eliminar personal asignado a un evento
     """
-    try:
-        responsable = Responsable.objects.get(email=request.user.email)
-    except Responsable.DoesNotExist:
+    responsable = responsable_de_usuario(request)
+    if responsable is None:
         messages.error(request, 'No se encontró información del responsable.')
         return redirect('catering:index')
     
@@ -1,10 +1,45 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.utils import timezone
-from datetime import timedelta
-from .models import Personal, Servicio, EventoSolicitado, PerfilUsuario
+from django.http import JsonResponse
+from .models import Servicio, EventoSolicitado, PerfilUsuario
 from .decorators import empleado_required, get_user_profile
+from .estadisticas import estadisticas_servicios
+from .paneles import respuesta_panel, datos_evento
+from .fichas import id_ficha, personal_de_usuario
+
+def _servicios_filtrados(id_personal, parametros):
+    """Servicios del trabajador con los filtros de estado y fechas de la lista de servicios"""
+    servicios = Servicio.objects.filter(id_personal_id=id_personal)
+
+    estado = parametros.get('estado', '')
+    fecha_desde = parametros.get('fecha_desde', '')
+    fecha_hasta = parametros.get('fecha_hasta', '')
+    if estado:
+        servicios = servicios.filter(estado=estado)
+    if fecha_desde:
+        servicios = servicios.filter(id_evento__fecha__gte=fecha_desde)
+    if fecha_hasta:
+        servicios = servicios.filter(id_evento__fecha__lte=fecha_hasta)
+    return servicios
+
+def _estadisticas_panel(servicios):
+    """Contadores que muestran el dashboard y la lista de servicios, iguales en la página y en el panel"""
+    estadisticas = estadisticas_servicios(servicios)
+    return {
+        'eventos_asignados': estadisticas['total'],
+        'eventos_confirmados': estadisticas['eventos_confirmados'],
+        'eventos_proximos': estadisticas['proximos'],
+        'eventos_completados': estadisticas['completados'],
+        'servicios_asignados': estadisticas['total'],
+    }
+
+def _eventos_de_servicios(servicios):
+    """Eventos de los servicios, sin repetir y del más reciente al más antiguo"""
+    eventos = {}
+    for servicio in servicios.select_related('id_evento__id_cliente').order_by('-id_evento__fecha', '-id_evento_id'):
+        eventos.setdefault(servicio.id_evento_id, servicio.id_evento)
+    return list(eventos.values())
 
 @empleado_required
 def trabajador_dashboard(request):
@@ -13,36 +48,18 @@ def trabajador_dashboard(request):
     """
     perfil = get_user_profile(request.user)
 
-    try:
-        personal = Personal.objects.get(email=request.user.email)
-    except Personal.DoesNotExist:
+    personal = personal_de_usuario(request)
+    if personal is None:
         messages.error(request, 'No se encontró información del trabajador.')
         return redirect('catering:index')
 
-    servicios = Servicio.objects.filter(id_personal=personal).order_by('-fecha_asignacion')
-
-    total_servicios = servicios.count()
-    servicios_activos = servicios.filter(estado__in=['ASIGNADO', 'EN_SERVICIO']).count()
-    servicios_completados = servicios.filter(estado='COMPLETADO').count()
-
-    servicios_proximos = servicios.filter(
-        id_evento__fecha__gte=timezone.now().date(),
-        id_evento__fecha__lte=timezone.now().date() + timedelta(days=30)
-    ).order_by('id_evento__fecha', 'id_evento__hora')[:5]
-
-    servicios_hoy = servicios.filter(
-        id_evento__fecha=timezone.now().date()
-    ).order_by('id_evento__hora')
+    servicios = _servicios_filtrados(personal.pk, {})
     
     context = {
         'personal': personal,
         'perfil': perfil,
-        'total_servicios': total_servicios,
-        'servicios_activos': servicios_activos,
-        'servicios_completados': servicios_completados,
-        'servicios_proximos': servicios_proximos,
-        'servicios_hoy': servicios_hoy,
-        'servicios': servicios[:10],
+        'estadisticas': _estadisticas_panel(servicios),
+        'eventos_asignados': _eventos_de_servicios(servicios),
     }
     
     return render(request, 'catering/trabajador_dashboard.html', context)
@@ -52,26 +69,12 @@ def trabajador_servicios(request):
     """
     Lista de servicios del trabajador
     """
-    try:
-        personal = Personal.objects.get(email=request.user.email)
-    except Personal.DoesNotExist:
+    personal = personal_de_usuario(request)
+    if personal is None:
         messages.error(request, 'No se encontró información del trabajador.')
         return redirect('catering:index')
 
-    estado = request.GET.get('estado', '')
-    fecha_desde = request.GET.get('fecha_desde', '')
-    fecha_hasta = request.GET.get('fecha_hasta', '')
-    
-    servicios = Servicio.objects.filter(id_personal=personal)
-    
-    if estado:
-        servicios = servicios.filter(estado=estado)
-    if fecha_desde:
-        servicios = servicios.filter(id_evento__fecha__gte=fecha_desde)
-    if fecha_hasta:
-        servicios = servicios.filter(id_evento__fecha__lte=fecha_hasta)
-    
-    servicios = servicios.order_by('-id_evento__fecha')
+    servicios = _servicios_filtrados(personal.pk, request.GET).order_by('-id_evento__fecha')
 
     estados = [('ASIGNADO', 'Asignado'), ('EN_SERVICIO', 'En Servicio'), 
                ('COMPLETADO', 'Completado'), ('CANCELADO', 'Cancelado')]
@@ -81,22 +84,40 @@ def trabajador_servicios(request):
         'servicios': servicios,
         'estados': estados,
         'filtros': {
-            'estado': estado,
-            'fecha_desde': fecha_desde,
-            'fecha_hasta': fecha_hasta,
+            'estado': request.GET.get('estado', ''),
+            'fecha_desde': request.GET.get('fecha_desde', ''),
+            'fecha_hasta': request.GET.get('fecha_hasta', ''),
         }
     }
     
     return render(request, 'catering/trabajador_servicios.html', context)
 
+@empleado_required
+def trabajador_panel(request):
+    """
+    API con los contadores y eventos del trabajador para actualizar su panel sin recargar.
+    Acepta los mismos filtros que la lista de servicios.
+    """
+    id_personal = id_ficha(request, 'personal')
+    if id_personal is None:
+        return JsonResponse({'error': 'No se encontró información del trabajador.'}, status=404)
+
+    def construir():
+        servicios = _servicios_filtrados(id_personal, request.GET)
+        return {
+            'estadisticas': _estadisticas_panel(servicios),
+            'eventos': [datos_evento(evento) for evento in _eventos_de_servicios(servicios)],
+        }
+
+    return respuesta_panel(request, [f'personal:{id_personal}'], construir)
+
 @empleado_required
 def trabajador_servicio_detail(request, pk):
     """
     Detalle de un servicio específico del trabajador - Solo información básica
     """
-    try:
-        personal = Personal.objects.get(email=request.user.email)
-    except Personal.DoesNotExist:
+    personal = personal_de_usuario(request)
+    if personal is None:
         messages.error(request, 'No se encontró información del trabajador.')
         return redirect('catering:index')
     
@@ -313,6 +313,15 @@ function verificarDisponibilidad(fecha) {
     });
 }
 
+function obtenerCalendarioDisponibilidad(desde, hasta) {
+    return new Promise((resolve, reject) => {
+        fetch(`/api/calendario-disponibilidad/?desde=${desde}&hasta=${hasta}`)
+            .then(response => response.json())
+            .then(data => resolve(data))
+            .catch(error => reject(error));
+    });
+}
+
 function cargarProductos(tipoProducto) {
     return new Promise((resolve, reject) => {
         // Verificar si existe el elemento antes de hacer la petición
@@ -365,11 +374,222 @@ function cargarProductos(tipoProducto) {
     });
 }
 
+// ===== PANELES CON ACTUALIZACIÓN PERIÓDICA =====
+function actualizarPanel(datos) {
+    Object.entries(datos.estadisticas || {}).forEach(([clave, valor]) => {
+        document.querySelectorAll(`[data-estadistica="${clave}"]`).forEach(elemento => {
+            elemento.textContent = valor;
+        });
+    });
+
+    const eventos = datos.eventos || [];
+    const vigentes = new Set(eventos.map(evento => String(evento.id)));
+    document.querySelectorAll('[data-item]').forEach(card => {
+        if (!vigentes.has(card.dataset.item)) {
+            card.remove();
+        }
+    });
+
+    let nuevos = 0;
+    eventos.forEach(evento => {
+        const card = document.querySelector(`[data-item="${evento.id}"]`);
+        if (!card) {
+            nuevos++;
+            return;
+        }
+        card.querySelectorAll('[data-campo]').forEach(elemento => {
+            const campo = elemento.dataset.campo;
+            if (campo in evento) {
+                elemento.textContent = evento[campo];
+            }
+        });
+        card.querySelectorAll('[data-estado]').forEach(badge => {
+            badge.classList.remove(`estado-${badge.dataset.estado.toLowerCase()}`);
+            badge.classList.add(`estado-${evento.estado.toLowerCase()}`);
+            badge.dataset.estado = evento.estado;
+        });
+    });
+
+    const aviso = document.querySelector('[data-panel-aviso]');
+    if (aviso) {
+        aviso.classList.toggle('d-none', nuevos === 0);
+        const cantidad = aviso.querySelector('[data-panel-nuevos]');
+        if (cantidad) {
+            cantidad.textContent = nuevos;
+        }
+    }
+}
+
+function sondearPanel(url, intervalo = 300000, urlStream = null) {
+    // Envía el último ETag recibido: si nada cambió el servidor responde 304 sin cuerpo
+    let etag = null;
+    let temporizador = null;
+
+    const consultar = () => {
+        const headers = etag ? { 'If-None-Match': etag } : {};
+        fetch(url + window.location.search, { headers, cache: 'no-store', credentials: 'same-origin' })
+            .then(response => {
+                if (response.status === 304) {
+                    return null;
+                }
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                etag = response.headers.get('ETag');
+                return response.json();
+            })
+            .then(datos => {
+                if (datos) {
+                    actualizarPanel(datos);
+                }
+            })
+            .catch(error => console.error('Error al actualizar el panel:', error));
+    };
+
+    const sondear = () => {
+        if (!temporizador) {
+            temporizador = setInterval(consultar, intervalo);
+        }
+    };
+
+    if (!urlStream || !window.EventSource) {
+        sondear();
+        return;
+    }
+
+    // Con el flujo SSE abierto el panel solo se consulta cuando el servidor avisa un cambio
+    const fuente = new EventSource(urlStream);
+    fuente.addEventListener('open', () => {
+        clearInterval(temporizador);
+        temporizador = null;
+        consultar();
+    });
+    ['estado_evento', 'asignacion_personal'].forEach(tipo => {
+        fuente.addEventListener(tipo, consultar);
+    });
+    fuente.addEventListener('error', () => {
+        // Mientras EventSource reintenta (o si el servidor no es ASGI) se vuelve al sondeo
+        sondear();
+    });
+}
+
+// ===== AUTOCOMPLETADO =====
+function iniciarAutocompletar(campo) {
+    const destino = document.getElementById(campo.dataset.destino);
+    const menu = campo.nextElementSibling;
+    let temporizador = null;
+    let controlador = null;
+    let activo = -1;
+
+    const cerrar = () => {
+        menu.classList.remove('show');
+        activo = -1;
+    };
+
+    const elegir = (resultado) => {
+        destino.value = resultado.id;
+        campo.value = resultado.texto;
+        cerrar();
+        destino.dispatchEvent(new Event('change', { bubbles: true }));
+    };
+
+    const marcar = (indice) => {
+        const opciones = menu.querySelectorAll('.dropdown-item');
+        opciones.forEach((opcion, i) => opcion.classList.toggle('active', i === indice));
+        activo = indice;
+    };
+
+    const mostrar = (resultados) => {
+        menu.innerHTML = '';
+        if (!resultados.length) {
+            const vacio = document.createElement('span');
+            vacio.className = 'dropdown-item-text text-muted';
+            vacio.textContent = 'Sin resultados';
+            menu.appendChild(vacio);
+        }
+        resultados.forEach(resultado => {
+            const opcion = document.createElement('button');
+            opcion.type = 'button';
+            opcion.className = 'dropdown-item';
+            opcion.textContent = resultado.texto;
+            if (resultado.detalle) {
+                const detalle = document.createElement('small');
+                detalle.className = 'text-muted ms-2';
+                detalle.textContent = resultado.detalle;
+                opcion.appendChild(detalle);
+            }
+            opcion.addEventListener('mousedown', (e) => {
+                e.preventDefault();
+                elegir(resultado);
+            });
+            menu.appendChild(opcion);
+        });
+        menu.classList.add('show');
+        activo = -1;
+    };
+
+    const consultar = () => {
+        // Solo cuenta la última consulta: las anteriores se cancelan
+        if (controlador) {
+            controlador.abort();
+        }
+        controlador = new AbortController();
+        const url = `${campo.dataset.autocompletar}?q=${encodeURIComponent(campo.value.trim())}`;
+        fetch(url, { signal: controlador.signal })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                campo._resultados = data.resultados;
+                mostrar(data.resultados);
+            })
+            .catch(error => {
+                if (error.name !== 'AbortError') {
+                    console.error('Error en el autocompletado:', error);
+                }
+            });
+    };
+
+    campo.addEventListener('input', () => {
+        // Editar el texto descarta la opción elegida hasta que se elija otra
+        destino.value = '';
+        clearTimeout(temporizador);
+        if (campo.value.trim().length < 2) {
+            cerrar();
+            return;
+        }
+        temporizador = setTimeout(consultar, 250);
+    });
+
+    campo.addEventListener('keydown', (e) => {
+        const resultados = campo._resultados || [];
+        if (!menu.classList.contains('show') || !resultados.length) return;
+        if (e.key === 'ArrowDown') {
+            e.preventDefault();
+            marcar(Math.min(activo + 1, resultados.length - 1));
+        } else if (e.key === 'ArrowUp') {
+            e.preventDefault();
+            marcar(Math.max(activo - 1, 0));
+        } else if (e.key === 'Enter' && activo >= 0) {
+            e.preventDefault();
+            elegir(resultados[activo]);
+        } else if (e.key === 'Escape') {
+            cerrar();
+        }
+    });
+
+    campo.addEventListener('blur', cerrar);
+}
+
 // ===== INICIALIZACIÓN =====
 let app;
 
 document.addEventListener('DOMContentLoaded', function() {
     app = new TuSolucionApp();
+    document.querySelectorAll('[data-autocompletar]').forEach(iniciarAutocompletar);
 });
 
 // ===== FUNCIONES GLOBALES =====
@@ -392,4 +612,7 @@ window.hideLoading = function(element, originalContent) {
 };
 
 window.verificarDisponibilidad = verificarDisponibilidad;
+window.obtenerCalendarioDisponibilidad = obtenerCalendarioDisponibilidad;
 window.cargarProductos = cargarProductos;
+window.actualizarPanel = actualizarPanel;
+window.sondearPanel = sondearPanel;
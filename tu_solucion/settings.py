@@ -42,6 +42,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'catering.middleware.PerfilUsuarioMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -64,6 +65,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'tu_solucion.wsgi.application'
+ASGI_APPLICATION = 'tu_solucion.asgi.application'
 
 DATABASES = {
     'default': {
@@ -76,6 +78,18 @@ DATABASES = {
     }
 } 
 
+# Con varios workers conviene una caché compartida (Redis, Memcached): LocMemCache es propia
+# de cada proceso, y catering.roles acorta a segundos la vigencia de los roles guardados en ella
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tu-solucion',
+    }
+}
+
+# 'memoria' para un único worker ASGI; 'cache' con una caché compartida (Redis, Memcached) si hay varios
+NOTIFICACIONES_BROKER = 'memoria'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',